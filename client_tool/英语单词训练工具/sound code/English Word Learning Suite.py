@@ -1,29 +1,80 @@
+import os
 import sys
-import csv
-import random
-import re
+import time
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                             QTextEdit, QFileDialog, QMessageBox, QTabWidget,
-                            QProgressBar, QGroupBox)
-from PyQt5.QtCore import Qt
-from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+                            QProgressBar, QGroupBox, QCheckBox)
+from PyQt5.QtCore import Qt, QFileSystemWatcher, QTimer
 from PyQt5.QtWidgets import QRadioButton, QButtonGroup, QSpinBox, QLabel
+from mapped_loader import MappedWordFile
+from word_store import WordStore
+from word_loader import SUPPORTED_EXTENSIONS, WORD_KEYS, load_word_file
+from word_merge import merge_word_files
+from word_scheduler import QUALITY_GOOD, QUALITY_HARD, QUALITY_WRONG, ReviewScheduler
+from word_selection import ExportSelector
+from dictation_engine import plan_sets
+from word_jobs import WordJob, export_task
+from progress_store import ProgressStore
+from word_watch import TextBankSnapshot
+from word_matcher import MATCH_EXACT, MATCH_NEAR, AnswerMatcher
+from perf_trace import enabled, span, summary, traced
+
+# 文件改动后等待多久再读取（毫秒），编辑器保存时可能连续触发多次
+WATCH_DELAY = 300
+# 启用性能记录时刷新状态栏汇总的间隔（毫秒）
+TRACE_REFRESH = 1000
+
 class WordLearningTool(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.words = []
+        self.words = WordStore(WORD_KEYS)
         self.learned_words = set()
-        self.current_round_words = []
+        # 出题顺序：按间隔重复的到期时间安排复习
+        self.scheduler = ReviewScheduler()
         self.current_word = None
+        # 当前单词编译好的答案，出题时准备，答题时直接判定
+        self.matcher = AnswerMatcher()
+        self.current_answer = None
         self.answer_shown = False
+        # 当前单词是否看过答案、是否已经评过分（每个单词只评分一次）
+        self.answer_seen = False
+        self.graded = False
         # 修改为两个独立的已导出单词集合
         self.exported_words_eng_to_chi = set()  # 英译中模式的已导出单词
         self.exported_words_chi_to_eng = set()  # 中译英模式的已导出单词
+        # 各模式的抽词器，单词重新加载后重建
+        self.export_selectors = {}
+        # 正在后台运行的加载或导出任务，同一时间只运行一个
+        self.job = None
+        # 任务结束后代替"就绪"显示在状态栏的信息
+        self.job_summary = None
+        # 已学会、已导出的单词按词库保存在数据库中，重启后继续；第一次加载词库时才打开
+        self.progress_store = None
+        self.bank = None
+        # 监视词库文件：改动后只把增删的单词应用到当前单词数据上
+        self.loaded_path = None
+        self.merged_paths = None  # 合并加载的多个词库文件，单个文件加载时为None
+        self.snapshot = None      # TXT词库上次加载时的内容，用于计算增量
+        self.removed_ids = set()  # 增量更新中删除的单词ID，单词存储只追加不删除
+        self.pair_ids = None      # (english, chinese) -> ID列表，第一次增量更新时建立
+        self.english_keys = None  # 各单词的英文，出题和导出共用，第一次用到时取得
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.file_changed)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(WATCH_DELAY)
+        self.watch_timer.timeout.connect(self.reload_changed_file)
         self.initUI()
 
+    def open_progress_store(self):
+        """打开学习进度数据库，无法打开时只在内存中记录本次进度"""
+        try:
+            return ProgressStore()
+        except Exception as e:
+            print(f"无法打开学习进度数据库，进度将不会保存：{e}")
+            return ProgressStore(':memory:')
+
     def initUI(self):
         self.setWindowTitle('英语单词学习工具')
         self.setGeometry(100, 100, 800, 600)
@@ -45,9 +96,26 @@ class WordLearningTool(QMainWindow):
         
         self.statusBar().showMessage('就绪')
         
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setVisible(False)
-        main_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
+        
+        self.cancel_btn = QPushButton("取消")
+        self.cancel_btn.clicked.connect(self.cancel_job)
+        self.cancel_btn.setVisible(False)
+        progress_layout.addWidget(self.cancel_btn)
+        main_layout.addLayout(progress_layout)
+        
+        # 设置了环境变量WORD_TRACE时，在状态栏右侧显示各环节的耗时和计数
+        if enabled():
+            self.trace_label = QLabel()
+            self.statusBar().addPermanentWidget(self.trace_label)
+            self.trace_timer = QTimer(self)
+            self.trace_timer.setInterval(TRACE_REFRESH)
+            self.trace_timer.timeout.connect(lambda: self.trace_label.setText(summary()))
+            self.trace_timer.start()
         
     def initLearningTab(self, parent):
         layout = QVBoxLayout(parent)
@@ -64,9 +132,19 @@ class WordLearningTool(QMainWindow):
         browse_btn.clicked.connect(self.browse_file)
         file_layout.addWidget(browse_btn)
         
-        load_btn = QPushButton("加载单词")
-        load_btn.clicked.connect(self.load_words)
-        file_layout.addWidget(load_btn)
+        self.load_btn = QPushButton("加载单词")
+        self.load_btn.clicked.connect(self.load_words)
+        file_layout.addWidget(self.load_btn)
+        
+        self.merge_btn = QPushButton("合并多个文件...")
+        self.merge_btn.setToolTip("同时加载多个词库，按英文单词去重并合并释义")
+        self.merge_btn.clicked.connect(self.merge_files)
+        file_layout.addWidget(self.merge_btn)
+        
+        self.watch_checkbox = QCheckBox("监视文件变化")
+        self.watch_checkbox.setToolTip("词库文件被修改后自动更新单词，保留学习进度")
+        self.watch_checkbox.toggled.connect(self.update_watch)
+        file_layout.addWidget(self.watch_checkbox)
         
         layout.addWidget(file_group)
         
@@ -198,9 +276,9 @@ class WordLearningTool(QMainWindow):
         browse_export_btn.clicked.connect(self.browse_export_path)
         export_layout.addWidget(browse_export_btn)
         
-        export_btn = QPushButton("导出Word文档")
-        export_btn.clicked.connect(self.export_to_word)
-        export_layout.addWidget(export_btn)
+        self.export_btn = QPushButton("导出Word文档")
+        self.export_btn.clicked.connect(self.export_to_word)
+        export_layout.addWidget(self.export_btn)
         
         layout.addWidget(export_group)
         
@@ -225,7 +303,7 @@ class WordLearningTool(QMainWindow):
             self,
             "选择单词文件",
             "",
-            "文本文件 (*.txt);;CSV文件 (*.csv);;Markdown文件 (*.md)"
+            "文本文件 (*.txt);;CSV文件 (*.csv);;Markdown文件 (*.md);;SQLite数据库 (*.db *.sqlite *.sqlite3)"
         )
         
         if file_name:
@@ -242,7 +320,9 @@ class WordLearningTool(QMainWindow):
         if file_name:
             self.export_path_edit.setText(file_name)
             
-    def load_words(self, file_path: str = None) -> bool:
+    def load_words(self, file_path: str = None, workers: int = None, mapped: bool = None,
+                   quiet: bool = False) -> bool:
+        """在后台加载单词文件，返回是否已开始加载；quiet时加载成功只在状态栏提示"""
         if file_path is None or file_path is False:  # ★ 防止接收到 False
             file_path = self.file_path_edit.text().strip()
         
@@ -250,101 +330,242 @@ class WordLearningTool(QMainWindow):
             QMessageBox.warning(self, "警告", "请先选择单词文件！")
             return False
         
-        if not file_path.lower().endswith(('.txt', '.csv', '.md')):
-            QMessageBox.warning(self, "格式错误", "仅支持.txt、.csv和.md格式的文件")
+        if not file_path.lower().endswith(SUPPORTED_EXTENSIONS):
+            QMessageBox.warning(self, "格式错误", "仅支持.txt、.csv、.md格式的文件和SQLite数据库")
             return False
         
-        self.words = []
-        
-        try:
-            if file_path.lower().endswith('.csv'):
-                # 现有CSV处理逻辑保持不变
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    csv_reader = csv.reader(f)
-                    headers = next(csv_reader, None)  # 跳过标题行
-                    for row in csv_reader:
-                        if len(row) >= 3:  # 确保至少有三列数据
-                            word = row[0].strip()  # 英文单词
-                            meaning = row[2].strip()  # 中文意思
-                            
-                            # 验证word是否为英文，meaning是否包含中文
-                            is_english_word = bool(re.match(r'^[a-zA-Z\s\-\']+$', word))
-                            has_chinese_meaning = any('\u4e00' <= c <= '\u9fff' for c in meaning)
-                            
-                            if is_english_word and has_chinese_meaning:
-                                self.words.append({'english': word, 'chinese': meaning})
-                            elif has_chinese_meaning:  # 如果word不是明显的英文但meaning包含中文，视为中文在前
-                                self.words.append({'chinese': word, 'english': meaning})
-                            else:  # 保守处理，默认英文在前
-                                self.words.append({'english': word, 'chinese': meaning})
-            elif file_path.lower().endswith('.md'):
-                # 添加Markdown表格解析逻辑
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    
-                    # 跳过表头和分隔行
-                    table_started = False
-                    for line in lines:
-                        line = line.strip()
-                        # 跳过空行
-                        if not line:
-                            continue
-                        
-                        # 检查是否是表格分隔行（包含|----|----|----|格式）
-                        if '|' in line and all(cell.strip() == '' or cell.strip() == '-'*len(cell.strip()) for cell in line.split('|')):
-                            table_started = True
-                            continue
-                        
-                        # 只处理表格数据行
-                        if table_started and line.startswith('|'):
-                            # 分割表格单元格
-                            cells = [cell.strip() for cell in line.split('|') if cell.strip()]
-                            
-                            # 确保至少有三列数据
-                            if len(cells) >= 3:
-                                word = cells[0]  # 英文单词
-                                meaning = cells[2]  # 中文意思
-                                
-                                # 验证word是否为英文，meaning是否包含中文
-                                is_english_word = bool(re.match(r'^[a-zA-Z\s\-\']+$', word))
-                                has_chinese_meaning = any('\u4e00' <= c <= '\u9fff' for c in meaning)
-                                
-                                if is_english_word and has_chinese_meaning:
-                                    self.words.append({'english': word, 'chinese': meaning})
-                                elif has_chinese_meaning:  # 如果word不是明显的英文但meaning包含中文，视为中文在前
-                                    self.words.append({'chinese': word, 'english': meaning})
-                                else:  # 保守处理，默认英文在前
-                                    self.words.append({'english': word, 'chinese': meaning})
-            else:  # .txt文件
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        parsed = self.parse_line(line.strip())
-                        if parsed:
-                            self.words.append(parsed)
-                
-            if not self.words:
-                QMessageBox.warning(self, "解析警告", "未能成功解析任何单词，请检查文件格式")
+        job = WordJob(load_word_file, file_path, workers=workers, mapped=mapped)
+        job.succeeded.connect(lambda words: self.words_loaded(words, file_path, quiet))
+        job.failed.connect(lambda message: QMessageBox.critical(self, "错误", f"加载文件时出错：{message}"))
+        return self.start_job(job, '正在加载单词...')
+        
+    def merge_files(self, file_paths=None, quiet=False):
+        """在后台加载并合并多个单词文件，返回是否已开始加载"""
+        if not file_paths:
+            file_paths, _ = QFileDialog.getOpenFileNames(
+                self,
+                "选择要合并的单词文件",
+                "",
+                "单词文件 (*.txt *.csv *.md *.db *.sqlite *.sqlite3)"
+            )
+            if not file_paths:
                 return False
-                
-            self.reset_round()
+        
+        unsupported = [path for path in file_paths if not path.lower().endswith(SUPPORTED_EXTENSIONS)]
+        if unsupported:
+            QMessageBox.warning(self, "格式错误", f"仅支持.txt、.csv、.md格式的文件和SQLite数据库：\n{unsupported[0]}")
+            return False
+        
+        file_paths = list(file_paths)
+        job = WordJob(merge_word_files, file_paths)
+        job.succeeded.connect(lambda result: self.words_loaded(result[0], file_paths, quiet, result[1]))
+        job.failed.connect(lambda message: QMessageBox.critical(self, "错误", f"合并文件时出错：{message}"))
+        return self.start_job(job, f'正在合并 {len(file_paths)} 个文件...')
+        
+    def words_loaded(self, words, file_path, quiet=False, report=None):
+        """后台加载完成后，在界面线程中一次性替换单词数据，并读取该词库保存的进度
+        
+        file_path为列表时是合并加载的多个文件，report为合并结果的统计
+        """
+        if not words:
+            if isinstance(words, MappedWordFile):
+                words.close()
+            QMessageBox.warning(self, "解析警告", "未能成功解析任何单词，请检查文件格式")
+            return
+        
+        # 只计入替换单词和读取进度的耗时，不包括之后的提示框
+        with span('words_loaded'):
+            self.close_words()
+            self.words = words
+            if self.progress_store is None:
+                self.progress_store = self.open_progress_store()
+            if isinstance(file_path, list):
+                self.bank = self.progress_store.merged_bank(file_path)
+                self.loaded_path = None
+                self.merged_paths = file_path
+            else:
+                self.bank = self.progress_store.bank(file_path)
+                self.loaded_path = file_path
+                self.merged_paths = None
+            self.learned_words = self.progress_store.learned(self.bank)
+            self.exported_words_eng_to_chi = self.progress_store.exported(self.bank, 'eng_to_chi')
+            self.exported_words_chi_to_eng = self.progress_store.exported(self.bank, 'chi_to_eng')
+            with span('scheduler.load'):
+                self.scheduler.load(self.word_keys(), self.learned_words,
+                                    self.progress_store.reviews(self.bank))
+            self.update_watch()
             self.update_stats()
+        if quiet:
+            self.job_summary = f'词库已重新加载，共 {len(self.words)} 个单词'
+        elif report is not None:
+            QMessageBox.information(self, "合并完成", report.summary(len(self.words)))
+        else:
             QMessageBox.information(self, "成功", f"成功加载 {len(self.words)} 个单词！")
-            return True
-            
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"加载文件时出错：{str(e)}")
+        
+    def start_job(self, job, message):
+        """启动后台任务：显示进度条和取消按钮，任务期间禁用加载和导出"""
+        if self.job is not None:
+            QMessageBox.warning(self, "警告", "请等待当前任务完成！")
             return False
+        
+        self.job = job
+        job.progress.connect(self.progress_bar.setValue)
+        job.status.connect(self.statusBar().showMessage)
+        job.finished.connect(lambda: self.job_finished(job))
+        
+        self.load_btn.setEnabled(False)
+        self.merge_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.setVisible(True)
+        self.statusBar().showMessage(message)
+        job.start()
+        return True
+        
+    def cancel_job(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.statusBar().showMessage('正在取消...')
             
-    def reset_round(self):
-        self.current_round_words = [
-            w for w in self.words if w['english'] not in self.learned_words
-        ]
-        random.shuffle(self.current_round_words)
+    def job_finished(self, job):
+        """后台线程结束后恢复界面"""
+        self.job = None
+        self.load_btn.setEnabled(True)
+        self.merge_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.cancel_btn.setVisible(False)
+        if job.outcome == 'cancelled':
+            self.statusBar().showMessage('已取消')
+        else:
+            self.statusBar().showMessage(self.job_summary or '就绪')
+        self.job_summary = None
+            
+    def closeEvent(self, event):
+        """关闭窗口时取消后台任务并等待线程结束"""
+        if self.job is not None:
+            self.job.cancel()
+            self.job.wait()
+        self.close_words()
+        if self.progress_store is not None:
+            self.progress_store.close()
+        super().closeEvent(event)
+            
+    def word_keys(self):
+        """各单词的英文，调度器和抽词器用它区分单词
+
+        两者都要按英文建立索引，加载时就需要全部英文；内存映射的词库只解码英文这一列，
+        而且只解码一次，中文仍在显示或导出时才解码
+        """
+        if self.english_keys is None:
+            self.english_keys = self.words.column('english')
+        return self.english_keys
+
+    def close_words(self):
+        """清空单词，并释放内存映射加载时占用的文件"""
+        if isinstance(self.words, MappedWordFile):
+            self.words.close()
+        self.words = WordStore(WORD_KEYS)
+        self.export_selectors = {}
+        self.removed_ids = set()
+        self.pair_ids = None
+        self.english_keys = None
+        self.snapshot = None
+        self.matcher.clear()
+        
+    def word_count(self):
+        """当前词库中的单词数（不含增量更新中删除的单词）"""
+        return len(self.words) - len(self.removed_ids)
+        
+    def update_watch(self):
+        """按复选框开始或停止监视当前词库文件"""
+        if self.watcher.files():
+            self.watcher.removePaths(self.watcher.files())
+        self.snapshot = None
+        if not self.watch_checkbox.isChecked():
+            return
+        if self.merged_paths:
+            # 合并加载的词库，任何一个文件改动后都重新合并
+            self.watcher.addPaths(self.merged_paths)
+            return
+        if not self.loaded_path:
+            return
+        self.watcher.addPath(self.loaded_path)
+        # 只有逐行解析的TXT词库能按行计算增量，其余格式改动后在后台完整重新加载
+        if self.loaded_path.lower().endswith('.txt') and isinstance(self.words, WordStore):
+            try:
+                self.snapshot = TextBankSnapshot.read(self.loaded_path)
+            except OSError:
+                self.snapshot = None
+                
+    def file_changed(self, path):
+        # 有的编辑器保存时先删除再重建文件，监视会随之失效，需要重新添加
+        if path not in self.watcher.files() and os.path.exists(path):
+            self.watcher.addPath(path)
+        self.watch_timer.start()
+        
+    def reload_changed_file(self):
+        """词库文件改动后：TXT词库应用增量，其余情况在后台完整重新加载"""
+        if self.merged_paths:
+            if not all(os.path.exists(path) for path in self.merged_paths):
+                return
+        elif not self.loaded_path or not os.path.exists(self.loaded_path):
+            return
+        if self.job is not None:
+            # 正在加载或导出，稍后再处理
+            self.watch_timer.start()
+            return
+        
+        if self.merged_paths:
+            self.merge_files(self.merged_paths, quiet=True)
+            return
+        if self.snapshot is None:
+            self.load_words(self.loaded_path, quiet=True)
+            return
+        try:
+            with open(self.loaded_path, 'rb') as f:
+                delta = self.snapshot.diff(f.read())
+        except (OSError, UnicodeDecodeError) as e:
+            self.statusBar().showMessage(f'读取词库改动失败：{e}')
+            return
+        if delta is None:
+            # 文件格式发生变化，逐行增量不再适用
+            self.load_words(self.loaded_path, quiet=True)
+            return
+        self.apply_word_delta(*delta)
+        
+    def apply_word_delta(self, removed, added):
+        """把删除和新增的(english, chinese)应用到单词数据上，学习进度和出题顺序保持不变"""
+        if self.pair_ids is None:
+            self.pair_ids = {}
+            columns = zip(self.words.column('english'), self.words.column('chinese'))
+            for word_id, pair in enumerate(columns):
+                if word_id not in self.removed_ids:
+                    self.pair_ids.setdefault(pair, []).append(word_id)
+        
+        for english, chinese in removed:
+            ids = self.pair_ids.get((english, chinese))
+            if ids:
+                word_id = ids.pop()
+                self.removed_ids.add(word_id)
+                self.scheduler.remove_word(english, word_id)
+        for english, chinese in added:
+            word_id = self.words.append({'english': english, 'chinese': chinese})
+            self.pair_ids.setdefault((english, chinese), []).append(word_id)
+            self.scheduler.add_word(english, word_id)
+        
+        # 抽词器在下次导出时按新的单词重建
+        self.export_selectors = {}
+        self.update_stats()
+        self.statusBar().showMessage(f'词库已更新：新增 {len(added)} 个，删除 {len(removed)} 个单词')
         
     def update_stats(self):
-        self.total_label.setText(f"总单词数: {len(self.words)}")
+        self.total_label.setText(f"总单词数: {self.word_count()}")
         self.learned_label.setText(f"已学习: {len(self.learned_words)}")
-        self.remaining_label.setText(f"剩余: {len(self.current_round_words)}")
+        self.remaining_label.setText(f"剩余: {len(self.scheduler)}")
         
     def start_english_to_chinese(self):
         self.current_mode = 'english_to_chinese'
@@ -354,15 +575,18 @@ class WordLearningTool(QMainWindow):
         self.current_mode = 'chinese_to_english'
         self.next_word()
         
+    @traced('next_word')
     def next_word(self):
-        if not self.current_round_words:
-            self.reset_round()
-            
-        if self.current_round_words:
-            self.current_word = self.current_round_words.pop(0)
+        with span('scheduler.next'):
+            word_id = self.scheduler.next()
+        if word_id is not None:
+            self.current_word = self.words[word_id]
+            self.current_answer = self.matcher.compile(word_id, self.current_word)
             self.input_edit.clear()
             self.result_label.clear()
             self.answer_shown = False
+            self.answer_seen = False
+            self.graded = False
             self.input_edit.setEnabled(True)
             
             if self.current_mode == 'english_to_chinese':
@@ -374,9 +598,15 @@ class WordLearningTool(QMainWindow):
                 
             self.update_stats()
         else:
-            self.word_label.setText("本轮学习已完成！")
+            next_due = self.scheduler.next_due()
+            if next_due:
+                when = time.strftime('%Y-%m-%d %H:%M', time.localtime(next_due))
+                self.word_label.setText(f"暂时没有需要复习的单词！\n下次复习：{when}")
+            else:
+                self.word_label.setText("暂时没有需要复习的单词！")
             self.input_edit.setEnabled(False)
             
+    @traced('check_answer')
     def check_answer(self):
         if not self.current_word:
             return
@@ -386,23 +616,43 @@ class WordLearningTool(QMainWindow):
             return
             
         if self.current_mode == 'english_to_chinese':
-            # 英译中模式：检查用户输入是否包含在正确答案中
-            # 转换为小写进行比较，忽略大小写差异
-            user_input_lower = user_input.lower()
-            correct_answer_lower = self.current_word['chinese'].lower()
-            correct = user_input_lower in correct_answer_lower
+            # 英译中模式：输入的意思出现在任一义项中即为正确，可以用逗号分隔输入多个意思
+            answer = self.current_word['chinese']
+            result = self.current_answer.check_chinese(user_input)
         else:
-            correct = user_input.lower() == self.current_word['english'].lower()
+            # 中译英模式：忽略大小写和连字符，拼写接近时也算答对
+            answer = self.current_word['english']
+            result = self.current_answer.check_english(user_input)
+        correct = result in (MATCH_EXACT, MATCH_NEAR)
             
-        if correct:
-            self.result_label.setText("✓ 回答正确！答案是：{answer}")
+        if result == MATCH_EXACT:
+            self.result_label.setText(f"✓ 回答正确！答案是：{answer}")
             self.result_label.setStyleSheet("color: green; font-size: 18px;")
-            self.learned_words.add(self.current_word['english'])
+        elif result == MATCH_NEAR:
+            self.result_label.setText(f"✓ 拼写接近！正确拼写是：{answer}")
+            self.result_label.setStyleSheet("color: orange; font-size: 18px;")
         else:
-            answer = self.current_word['chinese'] if self.current_mode == 'english_to_chinese' else self.current_word['english']
             self.result_label.setText(f"✗ 回答错误！正确答案是：{answer}")
             self.result_label.setStyleSheet("color: red; font-size: 18px;")
             
+        if correct:
+            self.learned_words.add(self.current_word['english'])
+            if self.bank is not None:
+                self.progress_store.mark_learned(self.bank, self.current_word['english'])
+            
+        # 每个单词只按第一次作答评分，决定下次复习的时间
+        if not self.graded:
+            self.graded = True
+            if not correct:
+                quality = QUALITY_WRONG
+            elif self.answer_seen or result == MATCH_NEAR:
+                quality = QUALITY_HARD
+            else:
+                quality = QUALITY_GOOD
+            card = self.scheduler.grade(self.current_word['english'], quality)
+            if card is not None and self.bank is not None:
+                self.progress_store.save_review(self.bank, self.current_word['english'], card.state())
+            
         self.update_stats()
     # 添加显示答案方法
     def show_answer(self):
@@ -420,52 +670,26 @@ class WordLearningTool(QMainWindow):
             self.result_label.setText(f"答案：{answer}")
             self.result_label.setStyleSheet("color: blue; font-size: 18px;")
             self.answer_shown = True
-    def parse_line(self, line):
-        """解析文件中的每一行，提取英文单词和中文意思
-        支持多种格式，包括：单词|词性|中文意思
-        """
-        # 首先检查是否是竖线分隔的格式：单词|词性|中文意思
-        if '|' in line:
-            parts = line.split('|')
-            if len(parts) >= 3:
-                # 提取英语单词和中文意思，忽略词性部分
-                english_word = parts[0].strip()
-                # 中文意思可能包含多个部分，合并后面的所有部分
-                chinese_meanings = '|'.join(parts[2:]).strip()
-                
-                # 验证这确实是英文单词和中文意思
-                if not any('\u4e00' <= c <= '\u9fff' for c in english_word) and chinese_meanings:
-                    return {'english': english_word, 'chinese': chinese_meanings}
-        
-        # 原有的分隔符支持保持不变
-        separators = [',', '：', ':', '\t', '  ']
-        
-        for sep in separators:
-            if sep in line:
-                parts = line.split(sep, 1)
-                if len(parts) == 2:
-                    part1, part2 = parts[0].strip(), parts[1].strip()
-                    if any('\u4e00' <= c <= '\u9fff' for c in part1):
-                        return {'chinese': part1, 'english': part2}
-                    else:
-                        return {'english': part1, 'chinese': part2}
-        
-        # 空格分隔的情况保持不变
-        words = line.split()
-        if len(words) >= 2:
-            english = []
-            chinese = []
-            for w in words:
-                if any('\u4e00' <= c <= '\u9fff' for c in w):
-                    chinese.append(w)
-                else:
-                    english.append(w)
-            if english and chinese:
-                return {'english': ' '.join(english), 'chinese': ' '.join(chinese)}
-        
-        return None
+            self.answer_seen = True
+    def export_selector(self, is_english_to_chinese):
+        """取得当前导出模式的抽词器，与对应的已导出单词集合共用同一个set"""
+        mode = 'eng_to_chi' if is_english_to_chinese else 'chi_to_eng'
+        selector = self.export_selectors.get(mode)
+        if selector is None:
+            if is_english_to_chinese:
+                exported = self.exported_words_eng_to_chi
+            else:
+                exported = self.exported_words_chi_to_eng
+            selector = ExportSelector(self.word_keys(), exported,
+                                      removed=self.removed_ids)
+            self.export_selectors[mode] = selector
+        return selector
 
     def export_to_word(self):
+        if self.job is not None:
+            QMessageBox.warning(self, "警告", "请等待当前任务完成！")
+            return
+            
         export_path = self.export_path_edit.text()
         if not export_path:
             QMessageBox.warning(self, "警告", "请先选择导出位置！")
@@ -482,7 +706,7 @@ class WordLearningTool(QMainWindow):
             sets_count = self.sets_spin.value()
             
             # 检查单词数量是否合理
-            total_words = len(self.words)
+            total_words = self.word_count()
             if word_count > total_words:
                 QMessageBox.warning(self, "警告", f"单词总数不足！当前只有{total_words}个单词，无法导出{word_count}个单词。")
                 return
@@ -498,142 +722,56 @@ class WordLearningTool(QMainWindow):
                 if response == QMessageBox.No:
                     return
             
-            # 根据模式选择对应的已导出单词集合
-            if is_english_to_chinese:
-                exported_words = self.exported_words_eng_to_chi
-            else:
-                exported_words = self.exported_words_chi_to_eng
-            
-            # 保存原始导出路径
-            import os
-            base_name, ext = os.path.splitext(export_path)
-            
-            # 导出多套
-            for set_num in range(1, sets_count + 1):
-                # 为每套装构建导出路径
-                if sets_count > 1:
-                    current_export_path = f"{base_name}_{set_num}{ext}"
-                else:
-                    current_export_path = export_path
-                
-                # 获取可用单词（未导出过的或所有单词，如果已全部导出）
-                available_words = [word for word in self.words if word['english'] not in exported_words]
-                
-                # 如果没有可用单词（都已导出过），重置已导出集合
-                need_reset = False
-                if not available_words:
-                    exported_words.clear()
-                    available_words = self.words.copy()
-                    need_reset = True
-                
-                # 检查可用单词数量是否足够
-                if len(available_words) < word_count:
-                    # 如果可用单词不够，从所有单词中补充
-                    remaining_needed = word_count - len(available_words)
-                    all_words_except_used = [word for word in self.words if word not in available_words]
-                    
-                    # 如果还有单词可以补充
-                    if all_words_except_used:
-                        # 随机选择需要补充的单词
-                        additional_words = random.sample(all_words_except_used, min(remaining_needed, len(all_words_except_used)))
-                        available_words.extend(additional_words)
-                    
-                    # 如果还是不够，从所有单词中随机选择（允许重复）
-                    if len(available_words) < word_count:
-                        remaining_needed = word_count - len(available_words)
-                        random_words = random.sample(self.words, remaining_needed)
-                        available_words.extend(random_words)
-                
-                # 随机选择指定数量的单词
-                selected_words = random.sample(available_words, word_count)
-                
-                # 更新已导出单词集合
-                for word in selected_words:
-                    exported_words.add(word['english'])
-                
-                # 创建Word文档
-                doc = Document()
-                
-                # 设置标题
-                if is_english_to_chinese:
-                    title_text = f'英语单词默写（英译中）- 第{set_num}套'
-                    if sets_count == 1:
-                        title_text = '英语单词默写（英译中）'
-                    title = doc.add_heading(title_text, 0)
-                    doc.add_paragraph('请根据英文写出对应的中文意思：')
-                else:
-                    title_text = f'英语单词默写（中译英）- 第{set_num}套'
-                    if sets_count == 1:
-                        title_text = '英语单词默写（中译英）'
-                    title = doc.add_heading(title_text, 0)
-                    doc.add_paragraph('请根据中文写出对应的英文单词：')
-                
-                title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                doc.add_paragraph('')
+            # 只计入抽词和建立抽词器的耗时，不包括上面的确认框；文档在后台生成，另有记录
+            with span('export_to_word'):
+                # 根据模式选择对应的抽词器（各自记录已导出的单词）
+                selector = self.export_selector(is_english_to_chinese)
+                # 记下抽词前的已导出单词，导出失败或取消时恢复
+                exported = set(selector.exported)
                 
-                # 添加信息段落
-                info_p = doc.add_paragraph()
-                info_p.add_run(f'单词数量：{word_count}个').bold = True
-                if need_reset:
-                    info_p.add_run(' （已重置单词列表）')
-                doc.add_paragraph('')
-                
-                # 创建表格
-                table = doc.add_table(rows=0, cols=2)
-                table.style = 'Table Grid'
-                
-                for word in selected_words:
-                    row = table.add_row()
-                    if is_english_to_chinese:
-                        # 英译中模式：显示英文，留空中文
-                        row.cells[0].text = word['english']
-                        row.cells[1].text = '__________'
-                    else:
-                        # 中译英模式：显示中文，留空英文
-                        row.cells[0].text = word['chinese']
-                        row.cells[1].text = '__________'
-                        
-                    for cell in row.cells:
-                        for p in cell.paragraphs:
-                            p.runs[0].font.size = Pt(12)
-                
-                # 添加答案页
-                doc.add_page_break()
-                doc.add_heading('答案', level=1)
-                
-                for word in selected_words:
-                    p = doc.add_paragraph()
-                    if is_english_to_chinese:
-                        # 英译中答案：英文 + 中文
-                        p.add_run(word['english'] + ': ').bold = True
-                        p.add_run(word['chinese'])
-                    else:
-                        # 中译英答案：中文 + 英文
-                        p.add_run(word['chinese'] + ': ').bold = True
-                        p.add_run(word['english'])
-                
-                # 保存文档
-                doc.save(current_export_path)
+                # 先为每一套抽好单词（多套时文件名后添加序号），各套之间互不依赖
+                with span('export.plan', sets=sets_count, words=word_count):
+                    jobs = plan_sets(self.words, selector, is_english_to_chinese,
+                                     word_count, sets_count, export_path)
             
-            # 更新对应模式的已导出单词集合
-            if is_english_to_chinese:
-                self.exported_words_eng_to_chi = exported_words
-                remaining_count = len([word for word in self.words if word['english'] not in exported_words])
-                mode_name = "英译中"
-            else:
-                self.exported_words_chi_to_eng = exported_words
-                remaining_count = len([word for word in self.words if word['english'] not in exported_words])
-                mode_name = "中译英"
-            
-            # 显示成功消息
-            message = f"Word文档已成功导出！\n"
-            message += f"本次共导出{sets_count}套，每套{word_count}个单词。\n"
-            message += f"{mode_name}模式下还剩余{remaining_count}个单词可导出。"
-            
-            QMessageBox.information(self, "成功", message)
+            # 多套文档在后台线程中交给进程池并行生成，进度显示在进度条上
+            job = WordJob(export_task, jobs)
+            job.succeeded.connect(lambda _: self.export_finished(selector, exported, is_english_to_chinese,
+                                                                 sets_count, word_count))
+            job.failed.connect(lambda message: self.export_aborted(
+                selector, exported, lambda: QMessageBox.critical(self, "错误", f"导出时出错：{message}")))
+            job.cancelled.connect(lambda: self.export_aborted(selector, exported))
+            self.start_job(job, '正在导出...')
             
         except Exception as e:
             QMessageBox.critical(self, "错误", f"导出时出错：{str(e)}")
+            
+    def export_finished(self, selector, exported, is_english_to_chinese, sets_count, word_count):
+        # 只把本次导出带来的变化写入数据库
+        if self.bank is not None:
+            mode = 'eng_to_chi' if is_english_to_chinese else 'chi_to_eng'
+            self.progress_store.update_exported(self.bank, mode, exported, set(selector.exported))
+        
+        remaining_count = selector.remaining()
+        mode_name = "英译中" if is_english_to_chinese else "中译英"
+        
+        # 显示成功消息
+        message = f"Word文档已成功导出！\n"
+        message += f"本次共导出{sets_count}套，每套{word_count}个单词。\n"
+        message += f"{mode_name}模式下还剩余{remaining_count}个单词可导出。"
+        
+        QMessageBox.information(self, "成功", message)
+        
+    def export_aborted(self, selector, exported, notify=None):
+        """导出失败或被取消：本次抽到的单词不计入已导出记录"""
+        selector.exported.clear()
+        selector.exported.update(exported)
+        # 抽词器的池子已经移出了这些单词，丢弃后下次导出时按恢复的记录重建
+        for mode, current in list(self.export_selectors.items()):
+            if current is selector:
+                del self.export_selectors[mode]
+        if notify:
+            notify()
 
 def main():
     app = QApplication(sys.argv)
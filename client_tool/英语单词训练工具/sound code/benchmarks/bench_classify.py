@@ -0,0 +1,57 @@
+"""对比逐行判断与整列判断中英文方向的耗时
+
+逐行判断即原先load_words中的写法：每行调用re.match并逐字符扫描汉字
+用法：python bench_classify.py [行数]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vocab_gen import make_rows
+from word_classify import swapped_rows
+
+
+def per_row(words, meanings):
+    swapped = []
+    for word, meaning in zip(words, meanings):
+        is_english_word = bool(re.match(r'^[a-zA-Z\s\-\']+$', word))
+        has_chinese_meaning = any('\u4e00' <= c <= '\u9fff' for c in meaning)
+        swapped.append(has_chinese_meaning and not is_english_word)
+    return swapped
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    # 大部分行英文在前，约10%的行中文在前
+    rng = random.Random(0)
+    words = []
+    meanings = []
+    for english, _, meaning in make_rows(count):
+        if rng.random() < 0.1:
+            english, meaning = meaning, english
+        words.append(english)
+        meanings.append(meaning)
+
+    start = time.perf_counter()
+    expected = per_row(words, meanings)
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = swapped_rows(words, meanings)
+    column_seconds = time.perf_counter() - start
+
+    if result != expected:
+        print("结果不一致！")
+        sys.exit(1)
+
+    print(f"行数: {count}")
+    print(f"逐行判断: {row_seconds:.3f} 秒")
+    print(f"整列判断: {column_seconds:.3f} 秒")
+    print(f"加速: {row_seconds / column_seconds:.1f} 倍")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""对比python-docx逐行生成与模板拼接生成默写卷的耗时
+
+两种方式生成同一套默写卷，并检查文档中的文字完全一致
+用法：python bench_docx.py [单词数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from docx import Document
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dictation_docx import BACKENDS, make_dictation_set
+from vocab_gen import make_rows
+
+
+def document_text(path):
+    doc = Document(path)
+    paragraphs = [p.text for p in doc.paragraphs]
+    cells = [cell.text for table in doc.tables for row in table.rows for cell in row.cells]
+    return paragraphs, cells
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    words = [{'english': word, 'chinese': meaning} for word, _, meaning in make_rows(count)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        seconds = {}
+        texts = {}
+        for name, save in BACKENDS.items():
+            job = make_dictation_set(os.path.join(folder, f'{name}.docx'), words, True, 1, 1, False)
+            # 先生成一次，排除导入和模板初始化的开销
+            save(job)
+            start = time.perf_counter()
+            save(job)
+            seconds[name] = time.perf_counter() - start
+            texts[name] = document_text(job['path'])
+
+    if texts['fast'] != texts['python-docx']:
+        print("文档内容不一致！")
+        sys.exit(1)
+
+    print(f"单词数: {count}")
+    for name, value in seconds.items():
+        print(f"{name}: {value:.3f} 秒")
+    print(f"加速: {seconds['python-docx'] / seconds['fast']:.1f} 倍")
+
+
+if __name__ == '__main__':
+    main()
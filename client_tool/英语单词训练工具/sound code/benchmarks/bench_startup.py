@@ -0,0 +1,93 @@
+"""测量学习工具和转换器的启动导入耗时，并检查是否超出预算
+
+在新的子进程中用 python -X importtime 导入程序模块（不创建窗口），
+取多次运行中最快的一次与预算比较，并列出耗时最多的模块；
+同时检查python-docx、进程池等应当推迟导入的模块没有在启动时被导入。
+超出预算或提前导入了这些模块时退出码为1。
+
+用法：python bench_startup.py [运行次数]
+"""
+import os
+import subprocess
+import sys
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 程序名 -> (脚本文件, 启动导入耗时预算（毫秒）)
+PROGRAMS = {
+    'suite': ('English Word Learning Suite.py', 250),
+    'converter': ('word_processor_gui.py', 250),
+}
+
+# 只在导出、并行解析或读写数据库时才需要的模块，启动时不应导入
+DEFERRED_MODULES = (
+    'docx',
+    'lxml',
+    'sqlite3',
+    'concurrent.futures.process',
+    'multiprocessing',
+    'urllib.request',
+)
+
+TOP_MODULES = 10
+
+# 子进程中执行：按文件路径导入脚本模块，不会运行main()
+IMPORT_CODE = '''
+import importlib.util, sys, time
+sys.path.insert(0, {folder!r})
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('startup_target', {path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+print((time.perf_counter() - start) * 1000)
+'''
+
+
+def measure(script):
+    """导入一次脚本，返回(总耗时毫秒, [(模块名, 累计耗时微秒), ...])"""
+    code = IMPORT_CODE.format(folder=SOURCE_DIR, path=os.path.join(SOURCE_DIR, script))
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, env=env, check=True)
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            modules.append((name.strip(), int(cumulative)))
+    return float(result.stdout.strip().splitlines()[-1]), modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    failed = False
+
+    for name, (script, budget) in PROGRAMS.items():
+        best = None
+        for _ in range(runs):
+            elapsed, modules = measure(script)
+            if best is None or elapsed < best[0]:
+                best = (elapsed, modules)
+        elapsed, modules = best
+
+        print(f"{name}（{script}）: {elapsed:.1f} 毫秒，预算 {budget} 毫秒")
+        for module, cumulative in sorted(modules, key=lambda item: -item[1])[:TOP_MODULES]:
+            print(f"    {cumulative / 1000:8.1f} 毫秒  {module}")
+
+        imported = sorted({module for module, _ in modules
+                           if any(module == deferred or module.startswith(deferred + '.')
+                                  for deferred in DEFERRED_MODULES)})
+        if imported:
+            failed = True
+            print(f"    启动时导入了应推迟的模块: {', '.join(imported)}")
+        if elapsed > budget:
+            failed = True
+            print("    超出预算！")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""整理工具与学习工具主要流程的基准测试
+
+用vocab_gen按固定随机种子生成各种格式的词库，在10k/100k/1M等规模下测量：
+    processor.load.*     WordProcessor.load_from_file（单进程）
+    processor.write.*    WordProcessor.to_markdown/to_csv/to_json/to_txt/to_sqlite
+    suite.load.*         学习工具加载词库（load_word_file，单进程，不使用已有缓存）
+    suite.cached.*       词库未改动时从缓存加载
+    suite.database       学习工具加载整理工具写出的SQLite词库
+    suite.parse_line.*   学习工具逐行解析（parse_word_line）
+    suite.export         抽词并生成默写卷（与export_to_word相同的流程，单进程）
+每项取多次运行中最快的一次作为耗时，另外在tracemalloc下运行一次得到Python内存分配的峰值
+（内存映射和子进程的内存不计入）。
+
+--save把结果保存为基准文件，--compare与保存的基准比较，
+耗时或内存峰值超过基准的(1+阈值)倍（且差值超过测量误差）时列为退化，退出码为1。
+基准与机器相关，应在同一台机器上保存和比较。
+
+用法：
+    python bench_suite.py --sizes 10k 100k 1M --save baseline.json
+    python bench_suite.py --compare baseline.json --threshold 0.2
+    python bench_suite.py --cases "suite.load.*" --sizes 100k
+"""
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vocab_gen import LAYOUTS, make_rows, parse_size, size_label, write_vocabulary
+from dictation_engine import plan_sets
+from dictation_docx import export_sets
+from word_cache import cache_path
+from word_loader import load_word_file
+from word_parser import parse_word_line
+from word_processor_nogui import WordProcessor
+from word_selection import ExportSelector
+
+# 1M规模全部测试项约需10分钟，需要时用--sizes指定
+DEFAULT_SIZES = ('10k', '100k')
+
+# 各流程测量的输入格式
+PROCESSOR_LAYOUTS = ('pos', 'pipe', 'csv')
+PROCESSOR_WRITERS = {
+    'markdown': ('to_markdown', '.md'),
+    'csv': ('to_csv', '.csv'),
+    'json': ('to_json', '.json'),
+    'txt': ('to_txt', '.txt'),
+    'sqlite': ('to_sqlite', '.db'),
+}
+SUITE_LAYOUTS = ('pipe', 'csv', 'markdown', 'colon', 'tab')
+PARSE_LINE_LAYOUTS = ('pipe', 'colon', 'tab')
+
+# 默写卷导出：套数和每套单词数
+EXPORT_SETS = 10
+EXPORT_WORDS = 50
+
+# 差值小于这些绝对值时视为测量误差，不算退化
+MIN_DELTA = {
+    'seconds': 0.01,
+    'peak': 64 * 1024,
+}
+
+
+def remove_cache(path):
+    try:
+        os.remove(cache_path(path))
+    except FileNotFoundError:
+        pass
+
+
+class Workspace:
+    """某个规模下的测试文件：每种格式只生成一次，在各个测试项之间共用"""
+
+    def __init__(self, folder, count, seed):
+        self.folder = folder
+        self.count = count
+        self.seed = seed
+        self.rows = None
+        self.files = {}
+
+    def file(self, layout):
+        path = self.files.get(layout)
+        if path is None:
+            if self.rows is None:
+                self.rows = make_rows(self.count, self.seed)
+            path = os.path.join(self.folder, f'{layout}_{size_label(self.count)}{LAYOUTS[layout]}')
+            self.files[layout] = write_vocabulary(path, layout, self.rows)
+        return path
+
+    def output(self, name):
+        return os.path.join(self.folder, name)
+
+
+# ---------------------------------------------------------------- 测试项
+# 每个测试项接收Workspace，做好准备工作后返回一个无参数的函数，只测量这个函数
+
+def processor_load(layout):
+    def setup(space):
+        path = space.file(layout)
+
+        def run():
+            processor = WordProcessor()
+            if not processor.load_from_file(path):
+                raise RuntimeError(f'加载失败: {path}')
+            return processor
+        return run
+    return setup
+
+
+def processor_write(writer):
+    method, ext = PROCESSOR_WRITERS[writer]
+
+    def setup(space):
+        processor = WordProcessor()
+        processor.load_from_file(space.file('pos'))
+        output = space.output('processor_output' + ext)
+        return lambda: getattr(processor, method)(output)
+    return setup
+
+
+def suite_load(layout):
+    def setup(space):
+        path = space.file(layout)
+
+        def run():
+            remove_cache(path)
+            return load_word_file(path, workers=1, mapped=False)
+        return run
+    return setup
+
+
+def suite_cached(layout):
+    def setup(space):
+        path = space.file(layout)
+        remove_cache(path)
+        load_word_file(path, workers=1, mapped=False)
+        return lambda: load_word_file(path)
+    return setup
+
+
+def suite_database(space):
+    processor = WordProcessor()
+    processor.load_from_file(space.file('pos'))
+    path = space.output('words.db')
+    processor.to_sqlite(path)
+    return lambda: load_word_file(path)
+
+
+def suite_parse_line(layout):
+    def setup(space):
+        with open(space.file(layout), encoding='utf-8') as f:
+            lines = f.readlines()
+        return lambda: [parse_word_line(line) for line in lines]
+    return setup
+
+
+def suite_export(space):
+    path = space.file('pipe')
+    remove_cache(path)
+    words = load_word_file(path, workers=1, mapped=False)
+    keys = words.column('english')
+    output = space.output('dictation.docx')
+
+    def run():
+        selector = ExportSelector(keys)
+        jobs = plan_sets(words, selector, True, EXPORT_WORDS, EXPORT_SETS, output)
+        export_sets(jobs, workers=1)
+    return run
+
+
+# 测试项名 -> 准备函数
+CASES = {}
+for _layout in PROCESSOR_LAYOUTS:
+    CASES[f'processor.load.{_layout}'] = processor_load(_layout)
+for _writer in PROCESSOR_WRITERS:
+    CASES[f'processor.write.{_writer}'] = processor_write(_writer)
+for _layout in SUITE_LAYOUTS:
+    CASES[f'suite.load.{_layout}'] = suite_load(_layout)
+CASES['suite.cached.pipe'] = suite_cached('pipe')
+CASES['suite.database'] = suite_database
+for _layout in PARSE_LINE_LAYOUTS:
+    CASES[f'suite.parse_line.{_layout}'] = suite_parse_line(_layout)
+CASES['suite.export'] = suite_export
+
+
+# ---------------------------------------------------------------- 测量
+
+def measure(run, repeat, memory=True):
+    """返回(最快一次的耗时秒数, Python内存分配峰值字节数)；memory为False时峰值为None"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        # 返回值可能持有内存映射的文件，先释放再进行下一次
+        close = getattr(result, 'close', None)
+        if close:
+            close()
+        del result
+        if best is None or elapsed < best:
+            best = elapsed
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        close = getattr(result, 'close', None)
+        if close:
+            close()
+        del result
+    return best, peak
+
+
+def result_key(case, count):
+    return f'{case}@{size_label(count)}'
+
+
+def format_bytes(value):
+    if value is None:
+        return '-'
+    return f'{value / 1024 / 1024:.1f} MB'
+
+
+def compare(results, baseline, threshold):
+    """与基准比较，返回退化的项目列表[(名称, 指标, 基准值, 当前值), ...]"""
+    regressions = []
+    for key, current in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        for metric in ('seconds', 'peak'):
+            before = old.get(metric)
+            after = current.get(metric)
+            if (before and after is not None and after > before * (1 + threshold)
+                    and after - before > MIN_DELTA[metric]):
+                regressions.append((key, metric, before, after))
+    return regressions
+
+
+def format_metric(metric, value):
+    return f'{value:.3f} 秒' if metric == 'seconds' else format_bytes(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="整理工具与学习工具的基准测试")
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                        help="词库规模，如10k 100k 1M（默认10k 100k）")
+    parser.add_argument('--cases', nargs='+', default=['*'],
+                        help="要运行的测试项，支持通配符（默认全部）")
+    parser.add_argument('--repeat', type=int, default=3, help="每项运行次数，取最快一次（默认3）")
+    parser.add_argument('--seed', type=int, default=0, help="生成词库的随机种子（默认0）")
+    parser.add_argument('--no-memory', action='store_true', help="不测量内存峰值")
+    parser.add_argument('--save', help="把结果保存为基准文件（JSON）")
+    parser.add_argument('--compare', help="与保存的基准文件比较")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="超过基准多少比例算退化（默认0.2，即20%%）")
+    parser.add_argument('--list', action='store_true', help="只列出测试项")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat必须大于0")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cases = [name for name in CASES if any(fnmatch.fnmatch(name, pattern) for pattern in args.cases)]
+    if args.list:
+        print('\n'.join(CASES))
+        return 0
+    if not cases:
+        print("没有匹配的测试项")
+        return 1
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in args.sizes:
+            count = parse_size(size)
+            space = Workspace(folder, count, args.seed)
+            print(f"规模 {size_label(count)}：")
+            for case in cases:
+                run = CASES[case](space)
+                seconds, peak = measure(run, args.repeat, not args.no_memory)
+                key = result_key(case, count)
+                results[key] = {'seconds': seconds, 'peak': peak}
+
+                line = f"  {case:<28} {seconds:9.3f} 秒  {format_bytes(peak):>10}"
+                old = baseline and baseline.get(key)
+                if old:
+                    line += f"  （基准 {old['seconds']:.3f} 秒，{seconds / old['seconds'] - 1:+.0%}）"
+                print(line)
+            # 释放这个规模的单词和文件，避免影响下一个规模的内存测量
+            for path in space.files.values():
+                remove_cache(path)
+                os.remove(path)
+            del space
+
+    if args.save:
+        data = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'results': results,
+        }
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"已保存基准：{args.save}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"退化（超过基准 {args.threshold:.0%}）：")
+            for key, metric, before, after in regressions:
+                print(f"  {key} {metric}: {format_metric(metric, before)} -> {format_metric(metric, after)}")
+            return 1
+        print("没有发现退化")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""对比字典列表与WordStore保存同样单词时的内存占用
+
+两种方式共用同一批字符串对象，统计的是容器本身的额外开销
+用法：python bench_word_store.py [单词数量]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vocab_gen import make_rows
+from word_store import WordStore
+
+
+def measure(build, rows):
+    """返回build(rows)构造出的对象额外占用的字节数"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def build_dicts(rows):
+    return [{'word': word, 'pos': pos, 'meaning': meaning} for word, pos, meaning in rows]
+
+
+def build_store(rows):
+    store = WordStore(('word', 'pos', 'meaning'), interned=('pos',))
+    for word, pos, meaning in rows:
+        store.append({'word': word, 'pos': pos, 'meaning': meaning})
+    return store
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    rows = make_rows(count)
+
+    dict_bytes = measure(build_dicts, rows)
+    store_bytes = measure(build_store, rows)
+
+    print(f"单词数量: {count}")
+    print(f"字典列表: {dict_bytes / 1024 / 1024:.1f} MB ({dict_bytes / count:.0f} 字节/词)")
+    print(f"WordStore: {store_bytes / 1024 / 1024:.1f} MB ({store_bytes / count:.0f} 字节/词)")
+    print(f"节省: {1 - store_bytes / dict_bytes:.0%}")
+
+
+if __name__ == '__main__':
+    main()
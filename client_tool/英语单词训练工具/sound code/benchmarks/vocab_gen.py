@@ -0,0 +1,121 @@
+"""生成测试用的大词库文件
+
+同一个随机种子总是生成相同的单词，按支持的各种输入格式写出：
+    pos       单词 词性.释义（整理工具的TXT格式）
+    pipe      单词|词性|释义
+    csv       单词,词性,释义（带标题行）
+    markdown  三列Markdown表格
+    colon     单词: 词性. 释义
+    tab       单词<Tab>词性. 释义
+
+用法：python vocab_gen.py 格式 单词数 输出文件 [随机种子]
+单词数可以写成10k、1M这样的形式
+"""
+import csv
+import os
+import random
+import sys
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+CHINESE = '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严'
+POS_VALUES = ('n', 'v', 'vt', 'vi', 'adj', 'adv', 'prep', 'conj', 'pron', 'int')
+
+# 格式名 -> 文件扩展名
+LAYOUTS = {
+    'pos': '.txt',
+    'pipe': '.txt',
+    'csv': '.csv',
+    'markdown': '.md',
+    'colon': '.txt',
+    'tab': '.txt',
+}
+
+# 单词数的简写后缀
+SIZE_SUFFIXES = {'k': 1000, 'm': 1000000}
+
+
+def parse_size(text):
+    """把'10k'、'1M'、'5000'这样的单词数转换为整数"""
+    text = text.strip().lower()
+    if text and text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def size_label(count):
+    """parse_size的反向：1000000 -> '1M'"""
+    if count >= 1000000 and count % 1000000 == 0:
+        return f'{count // 1000000}M'
+    if count >= 1000 and count % 1000 == 0:
+        return f'{count // 1000}k'
+    return str(count)
+
+
+def make_rows(count, seed=0):
+    """生成count个(单词, 词性, 释义)
+
+    单词是3~12个小写字母，少量带连字符；释义有1~3个义项，用中文分号分隔
+    """
+    rng = random.Random(seed)
+    choice = rng.choice
+    randint = rng.randint
+    rows = []
+    for _ in range(count):
+        word = ''.join(choice(LETTERS) for _ in range(randint(3, 12)))
+        if rng.random() < 0.02:
+            word += '-' + ''.join(choice(LETTERS) for _ in range(randint(2, 6)))
+        meaning = '；'.join(''.join(choice(CHINESE) for _ in range(randint(1, 4)))
+                           for _ in range(randint(1, 3)))
+        rows.append((word, choice(POS_VALUES), meaning))
+    return rows
+
+
+def format_lines(layout, rows):
+    """按格式逐行产出文件内容（不含换行符）"""
+    if layout == 'pos':
+        for word, pos, meaning in rows:
+            yield f'{word} {pos}.{meaning}'
+    elif layout == 'pipe':
+        for word, pos, meaning in rows:
+            yield f'{word}|{pos}|{meaning}'
+    elif layout == 'markdown':
+        yield '| 单词 | 词性 | 释义 |'
+        yield '|------|------|------|'
+        for word, pos, meaning in rows:
+            yield f'| {word} | {pos} | {meaning} |'
+    elif layout == 'colon':
+        for word, pos, meaning in rows:
+            yield f'{word}: {pos}. {meaning}'
+    elif layout == 'tab':
+        for word, pos, meaning in rows:
+            yield f'{word}\t{pos}. {meaning}'
+    else:
+        raise ValueError(f'不支持的格式: {layout}')
+
+
+def write_vocabulary(path, layout, rows):
+    """把rows按指定格式写入文件"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if layout == 'csv':
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['word', 'pos', 'meaning'])
+            writer.writerows(rows)
+        else:
+            for line in format_lines(layout, rows):
+                f.write(line + '\n')
+    return path
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[1] not in LAYOUTS:
+        print(__doc__)
+        sys.exit(1)
+    layout = sys.argv[1]
+    count = parse_size(sys.argv[2])
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    path = write_vocabulary(sys.argv[3], layout, make_rows(count, seed))
+    print(f'已生成 {path}：{count} 个单词，{os.path.getsize(path) / 1024 / 1024:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
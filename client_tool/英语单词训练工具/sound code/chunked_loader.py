@@ -0,0 +1,93 @@
+import os
+
+from perf_trace import count
+
+# 文件超过这个大小时才值得启动进程池
+PARALLEL_THRESHOLD = 32 * 1024 * 1024
+# 每个进程分到的块数，块切得细一些可以让各进程的负载更均衡
+CHUNKS_PER_WORKER = 4
+
+
+def auto_workers(file_path):
+    """根据文件大小决定使用的进程数，小文件直接单进程解析"""
+    try:
+        if os.path.getsize(file_path) < PARALLEL_THRESHOLD:
+            return 1
+    except OSError:
+        return 1
+    return os.cpu_count() or 1
+
+
+def split_chunks(file_path, parts):
+    """把文件按字节切成最多parts段，每段边界都对齐到换行符之后
+
+    返回[(起始偏移, 结束偏移), ...]
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return []
+
+    bounds = [0]
+    with open(file_path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()  # 跳过被切断的半行
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def parse_chunk(file_path, start, end, parse_line):
+    """在子进程中解析文件的一段，返回(解析成功的结果列表, 无法解析的非空行数)"""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+
+    # 与文本模式读取一致：统一换行符后逐行解析
+    results = []
+    rejected = 0
+    for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+        parsed = parse_line(line)
+        if parsed:
+            results.append(parsed)
+        elif line.strip():
+            rejected += 1
+    return results, rejected
+
+
+def parse_file_parallel(file_path, parse_line, workers, progress=None):
+    """用进程池并行解析文件，按原始行顺序合并结果
+
+    parse_line必须可以被pickle（模块级函数或普通对象的方法）；
+    progress: 可选回调，每合并完一块调用一次，参数为已完成的块比例（0~1）。
+    回调抛出异常时尚未开始的块会被取消；各块无法解析的行数汇总后计入性能记录
+    """
+    chunks = split_chunks(file_path, workers * CHUNKS_PER_WORKER)
+    results = []
+    if not chunks:
+        return results
+
+    # 进程池会连带导入multiprocessing，只在真正并行解析时才导入
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(
+            parse_chunk,
+            [file_path] * len(chunks),
+            [start for start, _ in chunks],
+            [end for _, end in chunks],
+            [parse_line] * len(chunks),
+        )
+        # executor.map按提交顺序返回，直接拼接即可保持原始顺序
+        rejected = 0
+        for done, (part, part_rejected) in enumerate(parts, 1):
+            results.extend(part)
+            rejected += part_rejected
+            if progress:
+                progress(done / len(chunks))
+    count('rows_rejected', rejected)
+    return results
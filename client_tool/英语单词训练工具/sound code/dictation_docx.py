@@ -0,0 +1,247 @@
+"""默写卷Word文档生成
+
+每套默写卷先整理成只包含字符串的任务字典（可以pickle），
+再在进程池中并行生成并保存各套文档。
+
+有两种生成方式：
+- python-docx：逐行调用add_row、设置文字和字号，最直观但行数多时很慢
+- fast（默认）：用python-docx生成一份只有一行题目、一条答案的样板文档，
+  取出其中的表格行和答案段落XML作为模板，批量拼接所有单词后直接写入docx压缩包，
+  得到的文档与python-docx方式一致
+
+python-docx（连带lxml）和进程池导入较慢，都推迟到第一次导出时才导入，
+不拖慢学习工具的启动。
+"""
+import io
+import os
+import re
+import zipfile
+
+from perf_trace import count, span
+
+BLANK = '__________'
+
+# 样板文档中的占位符
+TITLE_TOKEN = '@@TITLE@@'
+INSTRUCTION_TOKEN = '@@INSTRUCTION@@'
+COUNT_TOKEN = '@@COUNT@@'
+PROMPT_TOKEN = '@@PROMPT@@'
+ANSWER_TOKEN = '@@ANSWER@@'
+
+# XML中不允许出现的控制字符
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def escape(value):
+    """转义XML文本中的特殊字符（与xml.sax.saxutils.escape相同，但不必导入urllib等模块）"""
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def make_dictation_set(path, words, is_english_to_chinese, set_num, sets_count, need_reset):
+    """整理一套默写卷的内容
+
+    words为选中的单词（带english和chinese字段），返回生成文档所需的任务字典
+    """
+    if is_english_to_chinese:
+        title = '英语单词默写（英译中）'
+        instruction = '请根据英文写出对应的中文意思：'
+        # 英译中模式：显示英文，留空中文
+        rows = [(word['english'], word['chinese']) for word in words]
+    else:
+        title = '英语单词默写（中译英）'
+        instruction = '请根据中文写出对应的英文单词：'
+        # 中译英模式：显示中文，留空英文
+        rows = [(word['chinese'], word['english']) for word in words]
+    if sets_count > 1:
+        title = f'{title}- 第{set_num}套'
+
+    return {
+        'path': path,
+        'title': title,
+        'instruction': instruction,
+        'need_reset': need_reset,
+        'rows': rows,
+    }
+
+
+def build_document(job):
+    """按任务字典生成默写卷：标题、说明、题目表格和答案页"""
+    from docx import Document
+    from docx.shared import Pt
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+    doc = Document()
+
+    title = doc.add_heading(job['title'], 0)
+    doc.add_paragraph(job['instruction'])
+    title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    doc.add_paragraph('')
+
+    # 添加信息段落
+    info_p = doc.add_paragraph()
+    info_p.add_run(f"单词数量：{job.get('word_count', len(job['rows']))}个").bold = True
+    if job['need_reset']:
+        info_p.add_run(' （已重置单词列表）')
+    doc.add_paragraph('')
+
+    # 创建表格
+    table = doc.add_table(rows=0, cols=2)
+    table.style = 'Table Grid'
+
+    for prompt, _ in job['rows']:
+        row = table.add_row()
+        row.cells[0].text = prompt
+        row.cells[1].text = BLANK
+
+        for cell in row.cells:
+            for p in cell.paragraphs:
+                for run in p.runs:
+                    run.font.size = Pt(12)
+
+    # 添加答案页
+    doc.add_page_break()
+    doc.add_heading('答案', level=1)
+
+    for prompt, answer in job['rows']:
+        p = doc.add_paragraph()
+        p.add_run(prompt + ': ').bold = True
+        p.add_run(answer)
+
+    return doc
+
+
+def save_dictation_set(job):
+    """用python-docx生成并保存一套默写卷，返回保存路径"""
+    build_document(job).save(job['path'])
+    return job['path']
+
+
+class DocxTemplate:
+    """由样板文档拆出的模板：文档其余部分原样复用，只替换document.xml"""
+
+    def __init__(self, need_reset):
+        sample = {
+            'title': TITLE_TOKEN,
+            'instruction': INSTRUCTION_TOKEN,
+            'word_count': COUNT_TOKEN,
+            'need_reset': need_reset,
+            'rows': [(PROMPT_TOKEN, ANSWER_TOKEN)],
+        }
+        buffer = io.BytesIO()
+        build_document(sample).save(buffer)
+
+        with zipfile.ZipFile(buffer) as package:
+            self.parts = [(info, package.read(info.filename)) for info in package.infolist()]
+        xml = dict((info.filename, data) for info, data in self.parts)['word/document.xml'].decode('utf-8')
+
+        # 表格中的样板行
+        prompt = xml.index(PROMPT_TOKEN)
+        row_start = xml.rindex('<w:tr>', 0, prompt)
+        row_end = xml.index('</w:tr>', prompt) + len('</w:tr>')
+        # 答案页中的样板段落
+        answer = xml.rindex(ANSWER_TOKEN)
+        para_start = xml.rindex('<w:p>', 0, answer)
+        para_end = xml.index('</w:p>', answer) + len('</w:p>')
+
+        self.head = xml[:row_start]
+        self.middle = xml[row_end:para_start]
+        self.tail = xml[para_end:]
+        self.row = self.preserve(xml[row_start:row_end]).split(PROMPT_TOKEN)
+        self.answer = re.split(f'({PROMPT_TOKEN}|{ANSWER_TOKEN})', self.preserve(xml[para_start:para_end]))
+
+    @staticmethod
+    def preserve(xml):
+        """保留单词首尾的空格"""
+        return xml.replace('<w:t>', '<w:t xml:space="preserve">')
+
+    @staticmethod
+    def text(value):
+        return escape(INVALID_XML_CHARS.sub('', value))
+
+    def render(self, job):
+        """拼出这一套默写卷的document.xml"""
+        text = self.text
+        rows = [(text(prompt), text(answer)) for prompt, answer in job['rows']]
+        head = (self.head.replace(TITLE_TOKEN, text(job['title']))
+                .replace(INSTRUCTION_TOKEN, text(job['instruction']))
+                .replace(COUNT_TOKEN, str(len(rows))))
+
+        row_before, row_after = self.row
+        table = ''.join([row_before + prompt + row_after for prompt, _ in rows])
+
+        # answer模板被拆成[前缀, 占位符, 中间, 占位符, 后缀]
+        pieces = self.answer
+        prompt_first = pieces[1] == PROMPT_TOKEN
+        before, between, after = pieces[0], pieces[2], pieces[4]
+        if prompt_first:
+            answers = ''.join([before + prompt + between + answer + after for prompt, answer in rows])
+        else:
+            answers = ''.join([before + answer + between + prompt + after for prompt, answer in rows])
+
+        return head + table + self.middle + answers + self.tail
+
+    def save(self, job):
+        document = self.render(job).encode('utf-8')
+        with zipfile.ZipFile(job['path'], 'w', zipfile.ZIP_DEFLATED) as package:
+            for info, data in self.parts:
+                if info.filename == 'word/document.xml':
+                    data = document
+                package.writestr(info, data, zipfile.ZIP_DEFLATED)
+
+
+# 每个进程中按是否重置缓存的模板
+_templates = {}
+
+
+def save_dictation_set_fast(job):
+    """用模板批量拼接XML生成并保存一套默写卷，返回保存路径"""
+    template = _templates.get(job['need_reset'])
+    if template is None:
+        template = _templates[job['need_reset']] = DocxTemplate(job['need_reset'])
+    template.save(job)
+    return job['path']
+
+
+# 生成方式名称 -> 保存函数
+BACKENDS = {
+    'fast': save_dictation_set_fast,
+    'python-docx': save_dictation_set,
+}
+
+
+def export_sets(jobs, workers=None, progress=None, backend='fast'):
+    """生成并保存多套默写卷
+
+    多于一套时在进程池中并行生成；progress(已完成套数, 总套数)在每套完成后调用，
+    回调抛出异常时尚未开始的文档不再生成
+    """
+    save = BACKENDS[backend]
+    total = len(jobs)
+    if workers is None:
+        workers = min(total, os.cpu_count() or 1)
+
+    with span('export_sets', sets=total, workers=workers, backend=backend):
+        if workers <= 1 or total <= 1:
+            for done, job in enumerate(jobs, 1):
+                with span('save_set', words=len(job['rows'])):
+                    save(job)
+                count('sets_exported')
+                if progress:
+                    progress(done, total)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(save, job) for job in jobs]
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    future.result()  # 子进程中的异常在这里重新抛出
+                    count('sets_exported')
+                    if progress:
+                        progress(done, total)
+            except BaseException:
+                # 出错或在progress回调中被取消时，不再开始剩下的文档
+                for future in futures:
+                    future.cancel()
+                raise
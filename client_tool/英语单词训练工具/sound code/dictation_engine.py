@@ -0,0 +1,156 @@
+"""默写卷生成引擎与命令行入口
+
+加载词库、抽词、生成Word文档的流程不依赖PyQt5，可以在没有图形界面的服务器上运行。
+学习工具的导出标签页与命令行共用这里的抽词规则。
+
+用法：
+    python dictation_engine.py --input words.txt --mode en2zh --count 50 --sets 3 --out output
+    python dictation_engine.py --input 词库目录 --mode zh2en --out output --seed 1
+"""
+import argparse
+import os
+import random
+import sys
+from pathlib import Path
+
+from dictation_docx import export_sets, make_dictation_set
+from word_loader import SUPPORTED_EXTENSIONS, load_word_file
+from word_selection import ExportSelector
+
+# 命令行中的模式名 -> 是否英译中
+MODES = {
+    'en2zh': True,
+    'zh2en': False,
+}
+
+OUTPUT_SUFFIX = '_dictation'
+
+
+def set_paths(export_path, sets_count):
+    """各套默写卷的保存路径，多套时在文件名后添加序号"""
+    if sets_count == 1:
+        return [export_path]
+    base_name, ext = os.path.splitext(export_path)
+    return [f"{base_name}_{set_num}{ext}" for set_num in range(1, sets_count + 1)]
+
+
+def plan_sets(words, selector, is_english_to_chinese, word_count, sets_count, export_path):
+    """为每一套抽好单词，返回各套的文档任务
+
+    优先抽取未导出过的单词；全部导出过后重置，不够一套时用已导出的单词补足
+    """
+    jobs = []
+    for set_num, path in enumerate(set_paths(export_path, sets_count), 1):
+        selected_ids, need_reset = selector.select(word_count)
+        selected_words = [words[word_id] for word_id in selected_ids]
+        jobs.append(make_dictation_set(path, selected_words, is_english_to_chinese,
+                                       set_num, sets_count, need_reset))
+    return jobs
+
+
+def generate(input_path, export_path, is_english_to_chinese=True, word_count=50, sets_count=1,
+             seed=None, workers=None):
+    """为一个词库文件生成默写卷，返回保存的文件路径列表
+
+    单词数不足一套时抛出ValueError
+    """
+    words = load_word_file(input_path)
+    try:
+        if not words:
+            raise ValueError("未能成功解析任何单词，请检查文件格式")
+        if word_count > len(words):
+            raise ValueError(f"单词总数不足！当前只有{len(words)}个单词，无法导出{word_count}个单词。")
+
+        selector = ExportSelector(words.column('english'), rng=random.Random(seed))
+        jobs = plan_sets(words, selector, is_english_to_chinese, word_count, sets_count, export_path)
+    finally:
+        if hasattr(words, 'close'):
+            words.close()
+
+    export_sets(jobs, workers=workers)
+    return [job['path'] for job in jobs]
+
+
+def collect_inputs(paths):
+    """展开命令行中的输入：文件原样保留，目录取其中支持的词库文件（按文件名排序）"""
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir()
+                                if p.is_file() and p.name.lower().endswith(SUPPORTED_EXTENSIONS)))
+        else:
+            files.append(path)
+    return files
+
+
+def output_paths(inputs, out):
+    """各输入文件的默写卷保存路径
+
+    单个输入且--out以.docx结尾时直接作为保存路径，否则把--out视为输出目录，文件名为词库名加后缀；
+    词库名相同的文件（如a.txt和a.csv，或不同目录中的同名文件）在名字后加上扩展名区分，
+    仍然重名时再加序号（与整理工具的批量转换相同）；比较时不区分大小写
+    """
+    if len(inputs) == 1 and out.lower().endswith('.docx'):
+        return [out]
+    used = set()
+    paths = []
+    for input_file in inputs:
+        base, ext = input_file.stem, input_file.suffix[1:]
+        name = base
+        if name.lower() in used:
+            name = f"{base}_{ext}"
+        number = 2
+        while name.lower() in used:
+            name = f"{base}_{ext}_{number}"
+            number += 1
+        used.add(name.lower())
+        paths.append(os.path.join(out, name + OUTPUT_SUFFIX + '.docx'))
+    return paths
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="批量生成英语单词默写卷（不需要图形界面）")
+    parser.add_argument('--input', nargs='+', required=True,
+                        help="词库文件或目录（目录中的.txt/.csv/.md/.db文件都会处理）")
+    parser.add_argument('--mode', choices=sorted(MODES), default='en2zh',
+                        help="en2zh：英译中；zh2en：中译英（默认en2zh）")
+    parser.add_argument('--count', type=int, default=50, help="每套单词数量（默认50）")
+    parser.add_argument('--sets', type=int, default=1, help="每个词库导出的套数（默认1）")
+    parser.add_argument('--out', default='output',
+                        help="输出目录；只有一个输入文件时也可以是.docx文件路径（默认output）")
+    parser.add_argument('--seed', type=int, help="随机种子，指定后结果可重复")
+    parser.add_argument('--workers', type=int, help="生成文档的进程数（默认按CPU核数）")
+    args = parser.parse_args(argv)
+    if args.count < 1 or args.sets < 1:
+        parser.error("--count和--sets必须大于0")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    inputs = collect_inputs(args.input)
+    if not inputs:
+        print("没有找到可处理的词库文件")
+        return 1
+
+    failed = 0
+    for input_file, export_path in zip(inputs, output_paths(inputs, args.out)):
+        folder = os.path.dirname(export_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        try:
+            paths = generate(str(input_file), export_path, MODES[args.mode],
+                             args.count, args.sets, args.seed, args.workers)
+        except Exception as e:
+            failed += 1
+            print(f"{input_file}: 导出失败：{e}")
+            continue
+        print(f"{input_file}: 已导出{len(paths)}套 -> {', '.join(paths)}")
+
+    print(f"完成：成功{len(inputs) - failed}个，失败{failed}个")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+import mmap
+import os
+import re
+from array import array
+from collections.abc import Sequence
+
+from perf_trace import count
+
+# 超过这个大小的文件优先用内存映射加载
+MAPPED_THRESHOLD = 8 * 1024 * 1024
+
+# UTF-8编码下U+4E00~U+9FFF（常用汉字）的字节模式
+CJK_BYTES = re.compile(rb'\xe4[\xb8-\xbf][\x80-\xbf]|[\xe5-\xe9][\x80-\xbf][\x80-\xbf]')
+
+WHITESPACE = b' \t\r\n\x0b\x0c'
+
+# 不跟着\n的\r：文件中有这样的换行符时按通用换行（\r\n、\r、\n）分行，与文本模式读取一致
+BARE_CR = re.compile(rb'\r(?!\n)')
+LINE_END = re.compile(rb'\r\n|\r|\n')
+
+# 扫描时每隔多少行汇报一次进度
+PROGRESS_LINES = 65536
+
+# 学习工具支持的分隔符，顺序与parse_word_line一致
+SUITE_SEPARATORS = [b',', '：'.encode('utf-8'), b':', b'\t', b'  ']
+
+
+def strip_span(buf, start, end):
+    """去掉[start, end)两端的空白，返回新的范围"""
+    while start < end and buf[start] in WHITESPACE:
+        start += 1
+    while end > start and buf[end - 1] in WHITESPACE:
+        end -= 1
+    return start, end
+
+
+def scan_pos_line(buf, start, end):
+    """扫描"单词 词性.释义"格式的一行，返回(单词, 词性, 释义)三个字段的范围
+
+    与WordProcessor.parse_line规则一致，不符合格式时返回None
+    """
+    start, end = strip_span(buf, start, end)
+    space = buf.find(b' ', start, end)
+    if start == end or space < 0:
+        return None
+    dot = buf.find(b'.', space + 1, end)
+    if dot < 0:
+        return None
+    return ((start, space),
+            strip_span(buf, space + 1, dot),
+            strip_span(buf, dot + 1, end))
+
+
+def scan_pipe_fields(buf, start, end):
+    """单词|词性|中文意思，与parse_pipe_line规则一致；start、end已去掉两端空白"""
+    first = buf.find(b'|', start, end)
+    if first >= 0:
+        second = buf.find(b'|', first + 1, end)
+        if second >= 0:
+            english = strip_span(buf, start, first)
+            chinese = strip_span(buf, second + 1, end)
+            if chinese[0] < chinese[1] and not CJK_BYTES.search(buf, english[0], english[1]):
+                return english, chinese
+    return None
+
+
+def split_pair_fields(buf, start, end, index, length):
+    """按分隔符位置分成两部分，包含中文的一侧视为中文，与split_pair一致"""
+    part1 = strip_span(buf, start, index)
+    part2 = strip_span(buf, index + length, end)
+    if CJK_BYTES.search(buf, part1[0], part1[1]):
+        return part2, part1
+    return part1, part2
+
+
+class SeparatorScanner:
+    """按固定分隔符扫描一行，与SeparatorParser一致"""
+
+    __slots__ = ('sep',)
+
+    def __init__(self, sep):
+        self.sep = sep.encode('utf-8')
+
+    def __call__(self, buf, start, end):
+        index = buf.find(self.sep, start, end)
+        if index < 0:
+            return None
+        return split_pair_fields(buf, start, end, index, len(self.sep))
+
+
+def scan_suite_fields(buf, start, end):
+    """依次尝试竖线和各种分隔符，与parse_word_line一致；start、end已去掉两端空白
+
+    只用空格分隔、需要重新拼接的行无法用单个范围表示，返回'fallback'
+    """
+    if buf.find(b'|', start, end) >= 0:
+        fields = scan_pipe_fields(buf, start, end)
+        if fields:
+            return fields
+
+    for sep in SUITE_SEPARATORS:
+        index = buf.find(sep, start, end)
+        if index >= 0:
+            return split_pair_fields(buf, start, end, index, len(sep))
+
+    return 'fallback'
+
+
+def scan_suite_line(buf, start, end):
+    """扫描学习工具支持的一行，返回(英文, 中文)两个字段的范围
+
+    不区分文件格式，与parse_word_line规则一致；需要解码处理的行返回'fallback'，无法解析时返回None
+    """
+    start, end = strip_span(buf, start, end)
+    if start == end:
+        return None
+    return scan_suite_fields(buf, start, end)
+
+
+class SniffedLineScanner:
+    """字节版的SniffedLineParser：先用文件识别出的格式的扫描函数，不符合时再用通用扫描
+
+    没有扫描函数的格式（如空格分隔）一律返回'fallback'，交给该格式的解析器解码后处理，
+    因此内存映射加载与逐行、并行加载的结果相同
+    """
+
+    __slots__ = ('scan', 'fallback')
+
+    def __init__(self, scan, fallback):
+        self.scan = scan
+        self.fallback = fallback
+
+    def __call__(self, buf, start, end):
+        start, end = strip_span(buf, start, end)
+        if start == end:
+            return None
+        if self.scan is None:
+            return 'fallback'
+        fields = self.scan(buf, start, end)
+        if fields is None and self.fallback is not None:
+            fields = self.fallback(buf, start, end)
+        return fields
+
+
+class MappedWordFile(Sequence):
+    """基于mmap的只读单词文件
+
+    加载时只扫描UTF-8字节，为每条单词记录各字段的(偏移, 长度)，
+    取用某条单词时才解码出字符串，适合只读的大型词库
+    """
+
+    def __init__(self, file_path, keys, scan_line, fallback=None, progress=None):
+        """keys为各字段名；scan_line返回字段范围；fallback用于解析扫描器无法处理的行
+
+        progress: 可选回调，参数为已扫描的字节比例（0~1）
+        """
+        self.keys = tuple(keys)
+        self.width = len(self.keys) * 2
+        self.spans = array('Q')
+        # 无法用字节范围表示的少量单词，直接保存解析结果
+        self.extra = {}
+        self.file = open(file_path, 'rb')
+        if os.fstat(self.file.fileno()).st_size:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buffer = b''
+        try:
+            self.scan(scan_line, fallback, progress)
+        except BaseException:
+            self.close()
+            raise
+
+    def scan(self, scan_line, fallback, progress=None):
+        buf = self.buffer
+        spans = self.spans
+        placeholder = [0] * self.width
+        size = len(buf)
+        pos = 0
+        lines = 0
+        rejected = 0
+        # 绝大多数文件只用\n或\r\n换行，按\n查找即可（行尾的\r在扫描时作为空白去掉）
+        universal = BARE_CR.search(buf) is not None
+        while pos < size:
+            if universal:
+                match = LINE_END.search(buf, pos)
+                end, next_pos = (match.start(), match.end()) if match else (size, size)
+            else:
+                end = buf.find(b'\n', pos)
+                if end < 0:
+                    end = size
+                next_pos = end + 1
+            fields = scan_line(buf, pos, end)
+            if fields == 'fallback':
+                parsed = fallback(buf[pos:end].decode('utf-8')) if fallback else None
+                if parsed:
+                    self.extra[len(spans) // self.width] = parsed
+                    spans.extend(placeholder)
+                else:
+                    rejected += 1
+            elif fields:
+                for field_start, field_end in fields:
+                    spans.append(field_start)
+                    spans.append(field_end - field_start)
+            elif buf[pos:end].strip():
+                rejected += 1
+            pos = next_pos
+            lines += 1
+            if progress and lines % PROGRESS_LINES == 0:
+                progress(min(pos / size, 1.0))
+        count('rows_rejected', rejected)
+        if progress:
+            progress(1.0)
+
+    def __len__(self):
+        return len(self.spans) // self.width
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('word index out of range')
+        if index in self.extra:
+            return dict(self.extra[index])
+
+        buf = self.buffer
+        spans = self.spans
+        base = index * self.width
+        word = {}
+        for i, key in enumerate(self.keys):
+            offset = spans[base + i * 2]
+            word[key] = buf[offset:offset + spans[base + i * 2 + 1]].decode('utf-8')
+        return word
+
+    def column(self, key):
+        """解码某个字段的所有取值，按下标顺序排列；只解码这一个字段，其余字段仍在取用时才解码"""
+        buf = self.buffer
+        field = self.keys.index(key) * 2
+        offsets = self.spans[field::self.width]
+        lengths = self.spans[field + 1::self.width]
+        values = [buf[offset:offset + length].decode('utf-8') for offset, length in zip(offsets, lengths)]
+        for index, word in self.extra.items():
+            values[index] = word[key]
+        return values
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
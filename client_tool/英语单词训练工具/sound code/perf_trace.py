@@ -0,0 +1,219 @@
+"""性能记录（默认关闭）
+
+设置环境变量WORD_TRACE后启用，记录加载、出题、判定、导出等环节的耗时（时间段）和计数：
+    WORD_TRACE=1              只在状态栏显示汇总
+    WORD_TRACE=trace.json     另外在程序退出时把记录写成Chrome trace格式的JSON文件，
+                              可以在chrome://tracing或ui.perfetto.dev中打开
+未启用时span()返回同一个空的上下文管理器，count()直接返回，traced()不包装函数，几乎没有开销。
+后台线程中的记录也会汇总；进程池子进程中的耗时不会记录。
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+ENV_VAR = 'WORD_TRACE'
+
+# 保存的事件数上限，超过后只累计汇总，不再保存单个事件
+MAX_EVENTS = 200000
+
+# 汇总中显示的时间段数
+SUMMARY_SPANS = 4
+
+# 计数名称 -> 状态栏中显示的名称
+COUNTER_LABELS = {
+    'rows_parsed': '解析',
+    'rows_rejected': '无法解析',
+    'sets_exported': '导出套数',
+    'rows_merged': '合并重复',
+}
+
+NULL_SPAN = contextlib.nullcontext()
+
+# 函数接受*args时代码对象的标志位（与inspect.CO_VARARGS相同，导入inspect较慢）
+CO_VARARGS = 0x04
+
+
+class SpanStats:
+    """某个名称的时间段累计的次数、总耗时和最长耗时（秒）"""
+
+    __slots__ = ('calls', 'total', 'longest')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+
+class Span:
+    """一次计时，在with语句结束时记录"""
+
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.record(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class Tracer:
+    """收集时间段和计数；各方法可以在任意线程中调用"""
+
+    def __init__(self, enabled=False, path=None):
+        self.enabled = enabled
+        self.path = path
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self.dropped = 0
+        self.stats = {}
+        self.counters = {}
+
+    def span(self, name, **args):
+        """计时的上下文管理器：with span('load_word_file', file=...): ..."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def record(self, name, start, end, args=None):
+        duration = end - start
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats()
+            stats.calls += 1
+            stats.total += duration
+            if duration > stats.longest:
+                stats.longest = duration
+            self.add_event({
+                'name': name, 'ph': 'X',
+                'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6,
+                'pid': os.getpid(), 'tid': threading.get_ident(),
+                'args': args or {},
+            })
+
+    def count(self, name, value=1):
+        """累加一个计数，如count('rows_parsed', 1000)"""
+        if not self.enabled:
+            return
+        with self.lock:
+            total = self.counters[name] = self.counters.get(name, 0) + value
+            self.add_event({
+                'name': name, 'ph': 'C',
+                'ts': (time.perf_counter() - self.origin) * 1e6,
+                'pid': os.getpid(), 'tid': threading.get_ident(),
+                'args': {name: total},
+            })
+
+    def add_event(self, event):
+        if len(self.events) < MAX_EVENTS:
+            self.events.append(event)
+        else:
+            self.dropped += 1
+
+    def summary(self):
+        """一行汇总：总耗时最多的几个时间段和全部计数；未启用或没有记录时返回空字符串"""
+        if not self.enabled:
+            return ''
+        with self.lock:
+            spans = sorted(self.stats.items(), key=lambda item: -item[1].total)[:SUMMARY_SPANS]
+            counters = list(self.counters.items())
+        parts = [f"{name} {format_seconds(stats.total)}/{stats.calls}次" for name, stats in spans]
+        parts += [f"{COUNTER_LABELS.get(name, name)} {value}" for name, value in counters]
+        return '性能：' + '，'.join(parts) if parts else ''
+
+    def dump(self, path=None):
+        """把记录写成Chrome trace格式的JSON文件，返回写入的路径；没有路径时不写"""
+        path = path or self.path
+        if not path:
+            return None
+        with self.lock:
+            data = {
+                'traceEvents': list(self.events),
+                'displayTimeUnit': 'ms',
+                'otherData': {
+                    'dropped_events': self.dropped,
+                    'counters': dict(self.counters),
+                    'spans': {name: {'calls': stats.calls, 'total_ms': stats.total * 1000,
+                                     'max_ms': stats.longest * 1000}
+                              for name, stats in self.stats.items()},
+                },
+            }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        return path
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return f'{seconds:.2f}秒'
+    return f'{seconds * 1000:.1f}毫秒'
+
+
+def from_environment():
+    """按环境变量WORD_TRACE创建记录器，值以.json结尾时在退出时写出文件"""
+    value = os.environ.get(ENV_VAR, '').strip()
+    if not value or value == '0':
+        return Tracer()
+    tracer = Tracer(True, value if value.lower().endswith('.json') else None)
+    if tracer.path:
+        atexit.register(dump_at_exit, tracer)
+    return tracer
+
+
+def dump_at_exit(tracer):
+    try:
+        tracer.dump()
+    except OSError as e:
+        print(f"无法写入性能记录：{e}")
+
+
+TRACER = from_environment()
+
+
+def enabled():
+    return TRACER.enabled
+
+
+def span(name, **args):
+    return TRACER.span(name, **args)
+
+
+def traced(name):
+    """装饰器：启用时记录函数的每次调用；未启用时原样返回函数，没有任何开销"""
+    def decorate(func):
+        if not TRACER.enabled:
+            return func
+        # Qt信号会把全部参数传给包装函数（如clicked的checked），
+        # 与PyQt直接连接函数时一样，丢弃函数不接受的多余位置参数
+        code = func.__code__
+        positional = None if code.co_flags & CO_VARARGS else code.co_argcount
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(name):
+                return func(*args[:positional], **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1):
+    TRACER.count(name, value)
+
+
+def summary():
+    return TRACER.summary()
@@ -0,0 +1,126 @@
+"""学习进度的持久化存储
+
+已学会的单词、各模式已导出的单词和间隔重复的复习状态保存在SQLite数据库中（WAL模式），
+每次答对、导出时只插入或删除变化的几行，不重写整个文件；
+启动加载某个词库时只按主键前缀读出该词库的记录，耗时与进度条数成正比。
+多个词库的进度互不影响，用词库文件的绝对路径区分；合并加载的一组词库单独记录。
+sqlite3在打开数据库时才导入，不计入学习工具的启动时间。
+"""
+import os
+
+# 默认数据库位置：用户目录下，所有词库共用一个文件
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.word_learning', 'progress.sqlite3')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS banks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS learned (
+    bank INTEGER NOT NULL,
+    english TEXT NOT NULL,
+    PRIMARY KEY (bank, english)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS exported (
+    bank INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    english TEXT NOT NULL,
+    PRIMARY KEY (bank, mode, english)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reviews (
+    bank INTEGER NOT NULL,
+    english TEXT NOT NULL,
+    ease REAL NOT NULL,
+    interval REAL NOT NULL,
+    reps INTEGER NOT NULL,
+    due REAL NOT NULL,
+    PRIMARY KEY (bank, english)
+) WITHOUT ROWID;
+'''
+
+
+def bank_key(file_path):
+    """词库文件的标识：规范化后的绝对路径"""
+    return os.path.normcase(os.path.realpath(file_path))
+
+
+def merged_bank_key(file_paths):
+    """合并加载的多个词库作为一个整体记录进度：各文件标识排序后用换行连接
+
+    只有一个文件时与单独加载该文件共用进度
+    """
+    return '\n'.join(sorted({bank_key(file_path) for file_path in file_paths}))
+
+
+class ProgressStore:
+    """按词库记录学习进度；每个修改方法都立即提交"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        import sqlite3
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        # WAL模式下NORMAL已能保证数据库不损坏，断电时最多丢失最后几次提交
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    def bank(self, file_path):
+        """取得词库的编号，第一次使用时登记"""
+        return self.bank_id(bank_key(file_path))
+
+    def merged_bank(self, file_paths):
+        """取得合并加载的一组词库的编号"""
+        return self.bank_id(merged_bank_key(file_paths))
+
+    def bank_id(self, key):
+        with self.db:
+            self.db.execute('INSERT OR IGNORE INTO banks (path) VALUES (?)', (key,))
+        return self.db.execute('SELECT id FROM banks WHERE path = ?', (key,)).fetchone()[0]
+
+    def learned(self, bank):
+        """该词库已学会的英文单词集合"""
+        rows = self.db.execute('SELECT english FROM learned WHERE bank = ?', (bank,))
+        return {english for english, in rows}
+
+    def mark_learned(self, bank, english):
+        with self.db:
+            self.db.execute('INSERT OR IGNORE INTO learned (bank, english) VALUES (?, ?)',
+                            (bank, english))
+
+    def exported(self, bank, mode):
+        """该词库在某个导出模式下已导出的英文单词集合"""
+        rows = self.db.execute('SELECT english FROM exported WHERE bank = ? AND mode = ?',
+                               (bank, mode))
+        return {english for english, in rows}
+
+    def update_exported(self, bank, mode, before, after):
+        """把已导出记录从before更新为after，只写入两者的差异
+
+        after不包含before中的全部单词时，说明导出时重置过记录，先清空再写入
+        """
+        with self.db:
+            if not before <= after:
+                self.db.execute('DELETE FROM exported WHERE bank = ? AND mode = ?', (bank, mode))
+                added = after
+            else:
+                added = after - before
+            self.db.executemany('INSERT OR IGNORE INTO exported (bank, mode, english) VALUES (?, ?, ?)',
+                                ((bank, mode, english) for english in added))
+
+    def reviews(self, bank):
+        """该词库的复习状态：{英文单词: (ease, interval, reps, due)}"""
+        rows = self.db.execute('SELECT english, ease, interval, reps, due FROM reviews WHERE bank = ?',
+                               (bank,))
+        return {english: tuple(state) for english, *state in rows}
+
+    def save_review(self, bank, english, state):
+        """保存一个单词评分后的复习状态(ease, interval, reps, due)"""
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO reviews (bank, english, ease, interval, reps, due) '
+                            'VALUES (?, ?, ?, ?, ?, ?)', (bank, english, *state))
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,105 @@
+import hashlib
+import marshal
+import os
+import struct
+
+from word_store import WordStore
+
+# 缓存格式或解析规则变化时递增，旧缓存自动失效
+CACHE_VERSION = 2
+CACHE_SUFFIX = '.wordcache'
+# 文件开头记录头部长度，校验时只需读取头部
+HEADER_LENGTH = struct.Struct('<I')
+
+
+def cache_path(file_path):
+    """缓存文件放在词库文件旁边"""
+    return file_path + CACHE_SUFFIX
+
+
+def file_hash(file_path):
+    """计算文件内容的SHA-1"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_header(file_path, stat, content_hash):
+    return {
+        'version': CACHE_VERSION,
+        'source': os.path.abspath(file_path),
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'hash': content_hash,
+    }
+
+
+def load_cache(file_path, keys):
+    """读取词库的预编译缓存，缓存不存在或已失效时返回None
+
+    路径、修改时间和大小都没变时直接信任缓存；
+    修改时间变了但内容哈希相同（例如文件只是被复制或touch过）时仍然有效
+    """
+    path = cache_path(file_path)
+    try:
+        stat = os.stat(file_path)
+        with open(path, 'rb') as f:
+            length, = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+            header = marshal.loads(f.read(length))
+            if (not isinstance(header, dict)
+                    or header.get('version') != CACHE_VERSION
+                    or header.get('source') != os.path.abspath(file_path)
+                    or header.get('size') != stat.st_size):
+                return None
+            if header.get('mtime') != stat.st_mtime_ns:
+                if header.get('hash') != file_hash(file_path):
+                    return None
+                refresh = True
+            else:
+                refresh = False
+            payload = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError, struct.error):
+        return None
+
+    if not isinstance(payload, dict) or tuple(payload.get('keys', ())) != tuple(keys):
+        return None
+    store = WordStore.from_columns(keys, payload['columns'])
+    if refresh:
+        # 记下新的修改时间，下次不用再计算哈希
+        write_cache(path, make_header(file_path, stat, header['hash']), payload)
+    return store
+
+
+def save_cache(file_path, store):
+    """把解析好的单词存储写成缓存，失败时静默忽略（例如目录只读）"""
+    try:
+        stat = os.stat(file_path)
+        header = make_header(file_path, stat, file_hash(file_path))
+        payload = {
+            'keys': list(store.keys),
+            'columns': [list(store.column(key)) for key in store.keys],
+        }
+    except OSError:
+        return False
+    return write_cache(cache_path(file_path), header, payload)
+
+
+def write_cache(path, header, payload):
+    """先写临时文件再替换，避免留下写了一半的缓存"""
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            header_bytes = marshal.dumps(header)
+            f.write(HEADER_LENGTH.pack(len(header_bytes)))
+            f.write(header_bytes)
+            marshal.dump(payload, f)
+        os.replace(temp_path, path)
+        return True
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
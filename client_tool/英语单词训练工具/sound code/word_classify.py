@@ -0,0 +1,66 @@
+"""中英文判断
+
+所有正则预先编译；整列数据用map直接套用编译好的匹配函数，
+循环留在C层完成，避免逐字符的Python生成器。
+"""
+import re
+from itertools import compress
+from operator import not_
+
+# 常用汉字U+4E00~U+9FFF
+CHINESE_CHAR = re.compile('[\u4e00-\u9fff]')
+# 纯英文单词或短语：字母、空白、连字符、撇号
+ENGLISH_TEXT = re.compile(r"[a-zA-Z\s\-']+")
+
+_search_chinese = CHINESE_CHAR.search
+_match_english = ENGLISH_TEXT.fullmatch
+
+
+def has_chinese(text):
+    """文本中是否包含汉字"""
+    return _search_chinese(text) is not None
+
+
+def is_english(text):
+    """文本是否是纯英文单词或短语"""
+    return _match_english(text) is not None
+
+
+def chinese_flags(texts):
+    """整列判断是否包含汉字，返回与texts等长的布尔列表"""
+    return list(map(bool, map(_search_chinese, texts)))
+
+
+def english_flags(texts):
+    """整列判断是否为纯英文，返回与texts等长的布尔列表"""
+    return list(map(bool, map(_match_english, texts)))
+
+
+def swapped_rows(words, meanings):
+    """整列判断哪些行的第一列其实是中文（需要交换两列）
+
+    规则与逐行判断一致：释义含汉字且第一列不是纯英文时，视为中文在前
+    """
+    swapped = chinese_flags(meanings)
+    # 只需对释义含汉字的行再检查第一列
+    candidates = list(compress(range(len(swapped)), swapped))
+    english = map(_match_english, map(words.__getitem__, candidates))
+    for i in compress(candidates, english):
+        swapped[i] = False
+    return swapped
+
+
+def orient_columns(words, meanings):
+    """按列确定中英文方向，依次产出{'english', 'chinese'}"""
+    for word, meaning, swapped in zip(words, meanings, swapped_rows(words, meanings)):
+        if swapped:
+            yield {'chinese': word, 'english': meaning}
+        else:
+            yield {'english': word, 'chinese': meaning}
+
+
+def split_tokens(tokens):
+    """把一组词按是否包含汉字分成(英文词列表, 中文词列表)，保持原有顺序"""
+    flags = chinese_flags(tokens)
+    return (list(compress(tokens, map(not_, flags))),
+            list(compress(tokens, flags)))
@@ -0,0 +1,124 @@
+"""SQLite词库
+
+整理工具把单词写入SQLite数据库的words表(id, word, pos, meaning)，word列建有索引；
+学习工具可以直接加载这个数据库，不需要再逐行解析文本。
+sqlite3在用到时才导入，不影响两个程序的启动时间。
+Anki卡组（Anki的文本导入格式）也从数据库生成，同一个单词的多条释义合并到一张卡片。
+"""
+import csv
+import os
+from pathlib import Path
+
+# 数据库文件的扩展名
+DATABASE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL,
+    pos TEXT NOT NULL,
+    meaning TEXT NOT NULL
+);
+'''
+# 索引在全部数据写完后再建，比插入时逐条维护快
+INDEX = 'CREATE INDEX IF NOT EXISTS words_word ON words (word)'
+INSERT = 'INSERT INTO words (word, pos, meaning) VALUES (?, ?, ?)'
+
+# 学习工具加载时每次读取的行数，每批汇报一次进度
+FETCH_SIZE = 100000
+
+ANKI_DECK = '英语单词'
+# 同一单词多条释义合并时的分隔符
+ANKI_JOINER = '；'
+
+
+def is_database(file_path):
+    return file_path.lower().endswith(DATABASE_EXTENSIONS)
+
+
+class WordDatabaseWriter:
+    """新建数据库并批量写入单词
+
+    整个文件在一个事务中写入，每次用executemany插入一批，同一条INSERT语句只编译一次；
+    数据库是重新生成的，写入期间关闭回滚日志和同步，出错时文件不完整，重新转换即可
+    """
+
+    def __init__(self, output_path):
+        import sqlite3
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        self.db = sqlite3.connect(output_path, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=OFF')
+        self.db.execute('PRAGMA synchronous=OFF')
+        self.db.executescript(SCHEMA)
+        self.db.execute('BEGIN')
+
+    def insert(self, rows):
+        """rows为(word, pos, meaning)序列"""
+        self.db.executemany(INSERT, rows)
+
+    def close(self):
+        if self.db is None:
+            return
+        try:
+            self.db.execute(INDEX)
+            self.db.execute('COMMIT')
+        finally:
+            self.db.close()
+            self.db = None
+
+
+def open_readonly(file_path):
+    import sqlite3
+    return sqlite3.connect(Path(os.path.abspath(file_path)).as_uri() + '?mode=ro', uri=True)
+
+
+def read_database_words(file_path, progress=None):
+    """学习工具加载数据库词库，返回(英文列表, 中文列表)，按写入顺序排列
+
+    中文取meaning列（与“单词|词性|释义”格式的TXT一致，不含词性）
+    progress: 可选回调，参数为已读取的比例（0~1）
+    """
+    db = open_readonly(file_path)
+    try:
+        total = db.execute('SELECT count(*) FROM words').fetchone()[0] or 1
+        english = []
+        chinese = []
+        cursor = db.execute('SELECT word, meaning FROM words ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for word, meaning in rows:
+                english.append(word)
+                chinese.append(meaning)
+            if progress:
+                progress(min(len(english) / total, 1.0))
+        return english, chinese
+    finally:
+        db.close()
+
+
+def export_anki(database_path, output_path, deck=ANKI_DECK):
+    """从数据库生成Anki可导入的文本文件，返回卡片数量
+
+    正面为英文单词，背面为“词性. 释义”；同一单词的多条记录合并成一张卡片，
+    顺序与单词第一次出现的顺序相同。文件头注明分隔符、卡组和笔记类型，导入时不必手动选择
+    """
+    db = open_readonly(database_path)
+    try:
+        # 按写入顺序读一遍，在字典中合并（比SQL的GROUP BY再按min(id)排序快）
+        cards = {}
+        for word, pos, meaning in db.execute('SELECT word, pos, meaning FROM words ORDER BY id'):
+            back = f'{pos}. {meaning}' if pos else meaning
+            known = cards.get(word)
+            cards[word] = back if known is None else known + ANKI_JOINER + back
+    finally:
+        db.close()
+
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        f.write('#separator:tab\n#html:false\n#notetype:Basic\n')
+        f.write(f'#deck:{deck}\n#columns:Front\tBack\n')
+        # 字段中含有制表符、换行或引号时按CSV规则加引号，Anki可以正确识别
+        csv.writer(f, delimiter='\t', lineterminator='\n').writerows(cards.items())
+    return len(cards)
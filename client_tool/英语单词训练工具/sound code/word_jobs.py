@@ -0,0 +1,80 @@
+"""学习工具的后台任务
+
+加载词库、导出默写卷都放在QThread中执行，界面线程只接收进度信号和最终结果，
+任务运行期间窗口仍能响应操作。任务函数通过progress回调汇报进度；
+用户取消后，任务在下一次汇报进度时抛出JobCancelled中止。
+"""
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from dictation_docx import export_sets
+
+
+class JobCancelled(Exception):
+    """任务被用户取消"""
+
+
+class WordJob(QThread):
+    """在后台线程中运行task(*args, progress=回调, **kwargs)
+
+    task的返回值通过succeeded信号交给界面线程，出错时发出failed信号，
+    被取消时发出cancelled信号，三者只会发出其中一个
+    """
+
+    progress = pyqtSignal(int)  # 0~100
+    status = pyqtSignal(str)
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, task, *args, **kwargs):
+        super().__init__()
+        self.task = task
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_event = threading.Event()
+        self.percent = -1
+        # 任务结束后为'succeeded'、'failed'或'cancelled'
+        self.outcome = None
+
+    def cancel(self):
+        """请求取消，任务会在下一次汇报进度时停止"""
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report(self, fraction, message=None):
+        """任务的进度回调：只在百分比变化时发信号，避免大量信号堆积在界面线程"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        percent = int(fraction * 100)
+        if percent != self.percent:
+            self.percent = percent
+            self.progress.emit(percent)
+        if message:
+            self.status.emit(message)
+
+    def run(self):
+        try:
+            result = self.task(*self.args, progress=self.report, **self.kwargs)
+        except JobCancelled:
+            self.outcome = 'cancelled'
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.outcome = 'failed'
+            self.failed.emit(str(e))
+            return
+        self.outcome = 'succeeded'
+        self.succeeded.emit(result)
+
+
+def export_task(jobs, progress=None):
+    """导出默写卷的后台任务，progress按已完成的套数汇报"""
+    def report(done, total):
+        progress(done / total, f'正在导出：{done}/{total} 套')
+
+    export_sets(jobs, progress=report if progress else None)
+    return len(jobs)
@@ -0,0 +1,77 @@
+"""学习工具的词库加载
+
+根据文件类型和大小选择加载方式：预编译缓存、内存映射、多进程并行解析或逐行解析。
+不依赖界面，可以在后台线程中调用。
+"""
+import os
+
+from chunked_loader import auto_workers, parse_file_parallel
+from mapped_loader import MAPPED_THRESHOLD, MappedWordFile
+from perf_trace import count, span
+from word_cache import load_cache, save_cache
+from word_database import DATABASE_EXTENSIONS, is_database, read_database_words
+from word_parser import SUITE_LINE_FORMATS, iter_file_words
+from word_store import WordStore
+
+# 学习工具中单词数据的字段
+WORD_KEYS = ('english', 'chinese')
+
+SUPPORTED_EXTENSIONS = ('.txt', '.csv', '.md') + DATABASE_EXTENSIONS
+
+
+def load_word_file(file_path, workers=None, mapped=None, progress=None):
+    """加载词库文件（文本词库或SQLite数据库），返回单词序列（WordStore或MappedWordFile）
+
+    progress: 可选回调，参数为已完成的比例（0~1）
+    """
+    with span('load_word_file', file=os.path.basename(file_path)):
+        if is_database(file_path):
+            # 整理工具写出的SQLite词库本身就是解析好的数据，直接按列读取，不使用缓存
+            with span('parse', method='sqlite'):
+                words = WordStore.from_columns(WORD_KEYS, read_database_words(file_path, progress))
+            count('rows_parsed', len(words))
+            return words
+
+        # 词库没有改动时直接读取预编译缓存，跳过逐行解析
+        with span('load_cache'):
+            words = load_cache(file_path, WORD_KEYS)
+        if words is not None:
+            if progress:
+                progress(1.0)
+            return words
+
+        # 无法解析的行在各解析方式中边解析边统计
+        words = parse_word_file(file_path, workers, mapped, progress)
+        count('rows_parsed', len(words))
+
+        if words and isinstance(words, WordStore):
+            with span('save_cache'):
+                save_cache(file_path, words)
+        return words
+
+
+def parse_word_file(file_path, workers, mapped, progress):
+    if not file_path.lower().endswith('.txt'):
+        # CSV和Markdown表格按扩展名交给对应的格式解析
+        with span('parse', method='table'):
+            return WordStore(WORD_KEYS, iter_file_words(file_path, progress))
+
+    if workers is None:
+        workers = auto_workers(file_path)
+    if mapped is None:
+        # 单进程处理的大文件用内存映射加载，单词在显示或导出时才解码
+        mapped = workers == 1 and os.path.getsize(file_path) >= MAPPED_THRESHOLD
+    if mapped:
+        # 与逐行、并行加载一样，按文件开头识别出的格式扫描每一行
+        with span('parse', method='mapped'):
+            fmt = SUITE_LINE_FORMATS.sniff_file_format(file_path)
+            return MappedWordFile(file_path, WORD_KEYS, SUITE_LINE_FORMATS.scanner(fmt),
+                                  SUITE_LINE_FORMATS.parser(fmt), progress=progress)
+    if workers > 1:
+        # 大文件按行边界切块，多进程并行解析；分隔符只在开头判断一次
+        with span('parse', method='parallel', workers=workers):
+            parser = SUITE_LINE_FORMATS.sniff_file(file_path)
+            return WordStore(WORD_KEYS, parse_file_parallel(file_path, parser, workers, progress))
+    with span('parse', method='lines'):
+        return WordStore(WORD_KEYS, iter_file_words(file_path, progress))
+
@@ -0,0 +1,155 @@
+"""答案判定
+
+把每个单词的中文释义拆成规范化的义项列表、英文拆成可接受的拼写列表，编译一次后缓存，
+之后每次判定只对短字符串做比较，不再重复处理释义。
+- 英译中：输入的每个义项（可用逗号、分号、顿号等分隔）都能在某个释义义项中找到即为正确
+- 中译英：与任一拼写完全一致为正确；编辑距离在允许范围内（含相邻字母颠倒）算拼写接近
+"""
+import re
+import unicodedata
+
+MATCH_EXACT = 'exact'
+MATCH_NEAR = 'near'
+MATCH_WRONG = 'wrong'
+
+# 义项之间的分隔符
+SENSE_SEPARATORS = re.compile(r'[;；,，、/／|]+')
+# 释义开头的词性标记，如 n. vt. adj.
+POS_PREFIX = re.compile(r'^(?:[a-z]+\.\s*&?\s*)+')
+# 括号中的补充说明，如 苹果（水果）
+BRACKETS = re.compile(r'[(（\[【][^)）\]】]*[)）\]】]')
+# 判定时忽略的字符：空白和常见标点
+IGNORED = re.compile(r"[\s.。!！?？~～…·'\"“”‘’]+")
+# 英文中统一成空格的连接符
+ENGLISH_JOINERS = re.compile(r'[\s\-_]+')
+
+# 编译结果缓存的上限，超过后清空
+CACHE_LIMIT = 100000
+
+
+def normalize(text):
+    """全角转半角、统一小写、去掉空白和标点"""
+    return IGNORED.sub('', unicodedata.normalize('NFKC', text).lower())
+
+
+def chinese_senses(meaning):
+    """把中文释义拆成规范化的义项，括号内的说明可写可不写"""
+    text = unicodedata.normalize('NFKC', meaning).lower().strip()
+    senses = []
+    for part in SENSE_SEPARATORS.split(text):
+        part = POS_PREFIX.sub('', part.strip())
+        for variant in (part, BRACKETS.sub('', part)):
+            variant = normalize(variant)
+            if variant and variant not in senses:
+                senses.append(variant)
+    return tuple(senses)
+
+
+def normalize_english(text):
+    """小写，连字符、下划线和多个空白统一成一个空格"""
+    text = unicodedata.normalize('NFKC', text).lower().replace('’', "'")
+    return ENGLISH_JOINERS.sub(' ', text).strip()
+
+
+def english_forms(english):
+    """英文单词可接受的拼写，如 colour/color"""
+    forms = []
+    for part in SENSE_SEPARATORS.split(english):
+        form = normalize_english(BRACKETS.sub('', part))
+        if form and form not in forms:
+            forms.append(form)
+    return tuple(forms)
+
+
+def allowed_typos(word):
+    """按单词长度允许的拼写错误数：短词必须拼对"""
+    if len(word) <= 3:
+        return 0
+    if len(word) <= 7:
+        return 1
+    return 2
+
+
+def within_distance(a, b, limit):
+    """a与b的编辑距离（含相邻字符颠倒）是否不超过limit
+
+    只计算对角线附近宽度为2*limit+1的带状区域，某一行的最小值超过limit时提前结束，
+    耗时为O(limit * len(a))
+    """
+    if abs(len(a) - len(b)) > limit:
+        return False
+    if a == b:
+        return True
+    big = limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [big] * (len(b) + 1)
+        current[0] = i
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        row_min = current[0] if low == 1 else big
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return False
+        previous2, previous = previous, current
+    return previous[len(b)] <= limit
+
+
+class CompiledAnswer:
+    """一个单词编译好的答案"""
+
+    __slots__ = ('senses', 'forms')
+
+    def __init__(self, word):
+        self.senses = chinese_senses(word['chinese'])
+        self.forms = english_forms(word['english'])
+
+    def check_chinese(self, answer):
+        """英译中：输入的每个义项都要出现在某个释义义项中"""
+        parts = [normalize(part) for part in SENSE_SEPARATORS.split(answer)]
+        parts = [part for part in parts if part]
+        if not parts:
+            return MATCH_WRONG
+        for part in parts:
+            if not any(part in sense for sense in self.senses):
+                return MATCH_WRONG
+        return MATCH_EXACT
+
+    def check_english(self, answer):
+        """中译英：完全一致或拼写接近"""
+        answer = normalize_english(answer)
+        if not answer:
+            return MATCH_WRONG
+        if answer in self.forms:
+            return MATCH_EXACT
+        for form in self.forms:
+            if within_distance(answer, form, allowed_typos(form)):
+                return MATCH_NEAR
+        return MATCH_WRONG
+
+
+class AnswerMatcher:
+    """按单词ID缓存编译好的答案；出题时编译，答题时直接判定"""
+
+    def __init__(self):
+        self.cache = {}
+
+    def compile(self, word_id, word):
+        compiled = self.cache.get(word_id)
+        if compiled is None:
+            if len(self.cache) >= CACHE_LIMIT:
+                self.cache.clear()
+            compiled = self.cache[word_id] = CompiledAnswer(word)
+        return compiled
+
+    def clear(self):
+        self.cache.clear()
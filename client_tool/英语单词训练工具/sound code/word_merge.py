@@ -0,0 +1,162 @@
+"""合并多个词库文件并去重
+
+所有文件的单词依次经过一遍：按规范化后的英文（小写、全角转半角、连字符和多余空白统一）
+在字典中查找，第一次出现的单词登记ID，之后重复出现时把新的中文义项追加到已有释义后面，
+总耗时与单词总数成正比。
+两条释义没有任何相同或互相包含的义项时记为冲突（可能是不同的词或录入错误），
+释义照样合并，冲突单独列出。
+"""
+import os
+
+from perf_trace import count, span
+from word_loader import WORD_KEYS, load_word_file
+from word_matcher import POS_PREFIX, SENSE_SEPARATORS, normalize, normalize_english
+from word_store import WordStore
+
+# 合并后的义项分隔符
+SENSE_JOINER = '；'
+
+# 提示信息中列出的冲突条数
+REPORT_CONFLICTS = 10
+
+
+def merge_key(english):
+    """去重用的英文单词标识"""
+    # 绝大多数单词只有小写字母，规范化后就是自身
+    if english.isascii() and english.isalpha() and english.islower():
+        return english
+    return normalize_english(english)
+
+
+def split_senses(chinese):
+    """把释义拆成[(原文, 规范化后的义项), ...]，规范化时去掉词性标记、空白和标点"""
+    senses = []
+    for part in SENSE_SEPARATORS.split(chinese):
+        part = part.strip()
+        key = normalize(POS_PREFIX.sub('', part.lower()))
+        if key:
+            senses.append((part, key))
+    return senses
+
+
+def related(sense, senses):
+    """义项与已有义项之一相同或互相包含（如“苹果”和“苹果树”）"""
+    return any(sense in other or other in sense for other in senses)
+
+
+class MergeConflict:
+    """同一个英文单词在不同位置的释义没有相关的义项"""
+
+    __slots__ = ('english', 'first', 'other', 'first_file', 'other_file')
+
+    def __init__(self, english, first, other, first_file, other_file):
+        self.english = english
+        self.first = first
+        self.other = other
+        self.first_file = first_file
+        self.other_file = other_file
+
+    def __str__(self):
+        return (f"{self.english}：{self.first}（{os.path.basename(self.first_file)}）"
+                f" ≠ {self.other}（{os.path.basename(self.other_file)}）")
+
+
+class MergeReport:
+    """合并的统计结果"""
+
+    def __init__(self):
+        self.files = 0
+        self.rows = 0         # 读入的单词总数
+        self.duplicates = 0   # 重复出现、被合并掉的条数
+        self.merged = 0       # 释义因此增加了义项的次数
+        self.conflicts = []
+
+    def summary(self, unique):
+        lines = [f"合并 {self.files} 个文件，共读入 {self.rows} 个单词，去重后 {unique} 个。",
+                 f"重复 {self.duplicates} 条，其中 {self.merged} 条补充了新的释义。"]
+        if self.conflicts:
+            lines.append(f"{len(self.conflicts)} 个单词的释义互不相同（已合并，请核对）：")
+            lines += [f"  {conflict}" for conflict in self.conflicts[:REPORT_CONFLICTS]]
+            if len(self.conflicts) > REPORT_CONFLICTS:
+                lines.append(f"  ……还有 {len(self.conflicts) - REPORT_CONFLICTS} 个")
+        return '\n'.join(lines)
+
+
+class WordMerger:
+    """按规范化英文去重，逐条加入单词，最后得到合并后的单词存储"""
+
+    def __init__(self):
+        self.index = {}       # 规范化英文 -> ID
+        self.english = []
+        self.chinese = []
+        self.sources = []     # ID -> 第一次出现的文件
+        # 出现过重复的ID -> (义项原文列表, 规范化义项集合)；只为重复的单词拆分义项
+        self.senses = {}
+        self.report = MergeReport()
+
+    def add(self, english, chinese, source):
+        self.report.rows += 1
+        key = merge_key(english)
+        word_id = self.index.get(key)
+        if word_id is None:
+            self.index[key] = len(self.english)
+            self.english.append(english)
+            self.chinese.append(chinese)
+            self.sources.append(source)
+            return
+
+        self.report.duplicates += 1
+        if chinese == self.chinese[word_id]:
+            return
+        known = self.senses.get(word_id)
+        if known is None:
+            parts = split_senses(self.chinese[word_id])
+            known = self.senses[word_id] = ([part for part, _ in parts], {key for _, key in parts})
+        raw, keys = known
+
+        senses = split_senses(chinese)
+        added = [(part, key) for part, key in senses if key not in keys]
+        if not added:
+            return
+        if len(added) == len(senses) and keys and not any(related(key, keys) for _, key in senses):
+            self.report.conflicts.append(MergeConflict(self.english[word_id], self.chinese[word_id],
+                                                       chinese, self.sources[word_id], source))
+        for part, key in added:
+            raw.append(part)
+            keys.add(key)
+        self.chinese[word_id] = SENSE_JOINER.join(raw)
+        self.report.merged += 1
+
+    def add_words(self, words, source):
+        english = words.column('english')
+        chinese = words.column('chinese')
+        for index in range(len(words)):
+            self.add(english[index], chinese[index], source)
+        self.report.files += 1
+
+    def result(self):
+        return WordStore.from_columns(WORD_KEYS, (self.english, self.chinese))
+
+
+def merge_word_files(file_paths, progress=None):
+    """加载并合并多个词库文件，返回(WordStore, MergeReport)
+
+    progress: 可选回调，参数为已完成的比例（0~1）
+    """
+    merger = WordMerger()
+    total = len(file_paths)
+    with span('merge_word_files', files=total):
+        for done, file_path in enumerate(file_paths):
+            def report(fraction, done=done):
+                if progress:
+                    progress((done + fraction) / total)
+
+            words = load_word_file(file_path, progress=report)
+            try:
+                with span('merge', file=os.path.basename(file_path)):
+                    merger.add_words(words, file_path)
+            finally:
+                if hasattr(words, 'close'):
+                    words.close()
+        count('rows_merged', merger.report.duplicates)
+        return merger.result(), merger.report
@@ -0,0 +1,394 @@
+"""单词文件解析模块，学习工具与整理工具共用
+
+逐行格式通过注册表管理：每种格式提供一个识别函数和一个专用解析函数。
+读取文件时先用前若干行判断格式（分隔符），之后整个文件只走该格式的解析函数，
+专用解析失败的个别行再交给通用解析兜底。
+"""
+import csv
+import os
+import re
+from collections import Counter
+from itertools import chain, islice
+
+from mapped_loader import SeparatorScanner, SniffedLineScanner, scan_pipe_fields, scan_suite_fields
+from perf_trace import count
+from word_classify import has_chinese, is_english, orient_columns, split_tokens
+
+# 判断格式时采样的非空行数
+SNIFF_LINES = 50
+# CSV和Markdown按批整列判断中英文方向，每批的行数
+ORIENT_BATCH = 10000
+# 逐行读取时每隔多少行汇报一次进度
+PROGRESS_LINES = 10000
+
+# 学习工具支持的分隔符，按优先级排列
+SEPARATORS = [',', '：', ':', '\t', '  ']
+
+# "单词 词性.释义"格式：单词中不含空格和分隔符，词性后面紧跟句点
+POS_LINE = re.compile(r'^[^\s|,]+ [^.|]*\.')
+
+# Markdown表格中未被反斜杠转义的竖线
+MARKDOWN_CELL_SEPARATOR = re.compile(r'(?<!\\)\|')
+
+
+def orient(word, meaning):
+    """根据内容判断两列中哪一列是英文，返回{'english', 'chinese'}"""
+    has_chinese_meaning = has_chinese(meaning)
+    if is_english(word) and has_chinese_meaning:
+        return {'english': word, 'chinese': meaning}
+    elif has_chinese_meaning:  # 如果word不是明显的英文但meaning包含中文，视为中文在前
+        return {'chinese': word, 'english': meaning}
+    else:  # 保守处理，默认英文在前
+        return {'english': word, 'chinese': meaning}
+
+
+def split_markdown_row(line):
+    """按未转义的竖线分割Markdown表格行，并还原单元格中的\\|"""
+    return [cell.strip().replace('\\|', '|') for cell in MARKDOWN_CELL_SEPARATOR.split(line)]
+
+
+# ---------------------------------------------------------------- 学习工具的逐行格式
+
+def parse_pipe_line(line):
+    """单词|词性|中文意思"""
+    parts = line.split('|')
+    if len(parts) >= 3:
+        # 提取英语单词和中文意思，忽略词性部分
+        english_word = parts[0].strip()
+        # 中文意思可能包含多个部分，合并后面的所有部分
+        chinese_meanings = '|'.join(parts[2:]).strip()
+
+        # 验证这确实是英文单词和中文意思
+        if not has_chinese(english_word) and chinese_meanings:
+            return {'english': english_word, 'chinese': chinese_meanings}
+    return None
+
+
+def split_pair(line, sep):
+    """按分隔符分成两部分，包含中文的一侧视为中文"""
+    part1, part2 = line.split(sep, 1)
+    part1, part2 = part1.strip(), part2.strip()
+    if has_chinese(part1):
+        return {'chinese': part1, 'english': part2}
+    else:
+        return {'english': part1, 'chinese': part2}
+
+
+class SeparatorParser:
+    """按固定分隔符解析一行；用类而不是闭包，便于pickle传给子进程"""
+
+    __slots__ = ('sep',)
+
+    def __init__(self, sep):
+        self.sep = sep
+
+    def __call__(self, line):
+        if self.sep in line:
+            return split_pair(line, self.sep)
+        return None
+
+
+def parse_space_line(line):
+    """空格分隔，按是否包含中文把各个词分到两边"""
+    words = line.split()
+    if len(words) >= 2:
+        english, chinese = split_tokens(words)
+        if english and chinese:
+            return {'english': ' '.join(english), 'chinese': ' '.join(chinese)}
+    return None
+
+
+def parse_word_line(line):
+    """解析文件中的每一行，提取英文单词和中文意思
+    依次尝试：单词|词性|中文意思、各种分隔符、空格分隔
+    """
+    line = line.strip()
+    # 首先检查是否是竖线分隔的格式：单词|词性|中文意思
+    if '|' in line:
+        parsed = parse_pipe_line(line)
+        if parsed:
+            return parsed
+
+    for sep in SEPARATORS:
+        if sep in line:
+            return split_pair(line, sep)
+
+    return parse_space_line(line)
+
+
+# ---------------------------------------------------------------- 整理工具的逐行格式
+
+def parse_pos_line(line):
+    """单词 词性.释义"""
+    line = line.strip()
+    if not line:
+        return None
+
+    # 分离单词和释义
+    parts = line.split(' ', 1)
+    if len(parts) < 2:
+        return None
+
+    word = parts[0]
+    definition = parts[1]
+
+    # 分离词性和释义
+    if '.' in definition:
+        pos, meaning = definition.split('.', 1)
+        return {
+            'word': word,
+            'pos': pos.strip(),
+            'meaning': meaning.strip()
+        }
+    return None
+
+
+def parse_delimited_pos_line(line):
+    """单词|词性|释义（整理工具导出的TXT格式）"""
+    parts = line.strip().split('|', 2)
+    if len(parts) == 3 and parts[0]:
+        return {'word': parts[0], 'pos': parts[1], 'meaning': parts[2]}
+    return None
+
+
+def parse_csv_pos_line(line):
+    """单词,词性,释义（整理工具导出的CSV格式，跳过标题行）"""
+    line = line.strip()
+    if not line:
+        return None
+    parts = next(csv.reader([line]))
+    if len(parts) == 3 and parts[0] and parts != ['word', 'pos', 'meaning']:
+        return {'word': parts[0], 'pos': parts[1], 'meaning': parts[2]}
+    return None
+
+
+# ---------------------------------------------------------------- 注册表
+
+class SniffedLineParser:
+    """先用识别出的格式专用解析，失败的行再交给通用解析
+
+    只保存模块级函数，可以被pickle传给解析子进程
+    """
+
+    __slots__ = ('parse', 'fallback')
+
+    def __init__(self, parse, fallback):
+        self.parse = parse
+        self.fallback = fallback
+
+    def __call__(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        parsed = self.parse(line)
+        if parsed is None and self.fallback is not None:
+            parsed = self.fallback(line)
+        return parsed
+
+
+class LineFormatRegistry:
+    """逐行格式注册表：格式名 -> (识别函数, 专用解析函数)，按注册顺序决定优先级
+
+    格式还可以提供内存映射加载用的字节扫描函数（scan），规则与解析函数相同
+    """
+
+    def __init__(self, fallback=None, fallback_scan=None):
+        self.formats = {}
+        self.scanners = {}
+        self.fallback = fallback
+        self.fallback_scan = fallback_scan
+
+    def register(self, name, detect, parse, scan=None):
+        self.formats[name] = (detect, parse)
+        if scan is not None:
+            self.scanners[name] = scan
+
+    def classify(self, line):
+        """返回这一行按优先级匹配到的格式名"""
+        for name, (detect, _) in self.formats.items():
+            if detect(line):
+                return name
+        return None
+
+    def sniff(self, lines):
+        """根据样本行投票选出最常见的格式，无法判断时返回None"""
+        votes = Counter()
+        for line in lines:
+            line = line.strip()
+            if line:
+                name = self.classify(line)
+                if name:
+                    votes[name] += 1
+        if not votes:
+            return None
+        return votes.most_common(1)[0][0]
+
+    def parser(self, name):
+        """返回某个格式的逐行解析器；name为None时只用通用解析"""
+        if name is None:
+            return SniffedLineParser(self.fallback, None)
+        parse = self.formats[name][1]
+        return SniffedLineParser(parse, None if parse is self.fallback else self.fallback)
+
+    def scanner(self, name):
+        """返回某个格式的字节扫描器，与parser(name)的结果一致；name为None时只用通用扫描"""
+        if name is None:
+            return SniffedLineScanner(self.fallback_scan, None)
+        scan = self.scanners.get(name)
+        return SniffedLineScanner(scan, None if scan is self.fallback_scan else self.fallback_scan)
+
+    def sniff_stream(self, lines):
+        """从行迭代器中取样判断格式，返回(解析器, 包含样本在内的完整行迭代器)"""
+        lines = iter(lines)
+        sample = []
+        non_empty = 0
+        for line in lines:
+            sample.append(line)
+            if line.strip():
+                non_empty += 1
+                if non_empty >= SNIFF_LINES:
+                    break
+        return self.parser(self.sniff(sample)), chain(sample, lines)
+
+    def sniff_file(self, file_path):
+        """只读取文件开头的样本行，返回该文件适用的解析器"""
+        return self.parser(self.sniff_file_format(file_path))
+
+    def sniff_file_format(self, file_path):
+        """只读取文件开头的样本行，返回该文件的格式名，无法判断时返回None"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return self.sniff(islice((line for line in f if line.strip()), SNIFF_LINES))
+
+    def iter_parsed(self, lines):
+        """先判断格式，再逐行解析，只产出解析成功的结果；无法解析的非空行计入性能记录"""
+        parser, lines = self.sniff_stream(lines)
+        rejected = 0
+        for line in lines:
+            parsed = parser(line)
+            if parsed:
+                yield parsed
+            elif line.strip():
+                rejected += 1
+        count('rows_rejected', rejected)
+
+
+# 学习工具的TXT格式
+SUITE_LINE_FORMATS = LineFormatRegistry(fallback=parse_word_line, fallback_scan=scan_suite_fields)
+SUITE_LINE_FORMATS.register('pipe', lambda line: line.count('|') >= 2, parse_pipe_line, scan_pipe_fields)
+for _sep in SEPARATORS:
+    SUITE_LINE_FORMATS.register(repr(_sep), SeparatorParser(_sep), SeparatorParser(_sep),
+                                SeparatorScanner(_sep))
+SUITE_LINE_FORMATS.register('space', lambda line: len(line.split()) >= 2, parse_space_line)
+
+# 整理工具的格式
+PROCESSOR_LINE_FORMATS = LineFormatRegistry(fallback=parse_pos_line)
+PROCESSOR_LINE_FORMATS.register('pos', POS_LINE.match, parse_pos_line)
+PROCESSOR_LINE_FORMATS.register('delimited', lambda line: line.count('|') >= 2, parse_delimited_pos_line)
+PROCESSOR_LINE_FORMATS.register('csv', lambda line: line.count(',') >= 2, parse_csv_pos_line)
+
+
+# ---------------------------------------------------------------- 学习工具的整文件格式
+
+def iter_oriented(pairs):
+    """把(第1列, 第3列)按批收集，整列判断中英文方向后依次产出"""
+    words = []
+    meanings = []
+    for word, meaning in pairs:
+        words.append(word)
+        meanings.append(meaning)
+        if len(words) >= ORIENT_BATCH:
+            yield from orient_columns(words, meanings)
+            words = []
+            meanings = []
+    if words:
+        yield from orient_columns(words, meanings)
+
+
+def iter_csv_words(f):
+    """CSV：跳过标题行，取第1列和第3列"""
+    csv_reader = csv.reader(f)
+    next(csv_reader, None)  # 跳过标题行
+    return iter_oriented(iter_csv_cells(csv_reader))
+
+
+def iter_csv_cells(rows):
+    rejected = 0
+    for row in rows:
+        if len(row) >= 3:
+            yield row[0].strip(), row[2].strip()
+        elif any(cell.strip() for cell in row):
+            rejected += 1
+    count('rows_rejected', rejected)
+
+
+def iter_markdown_words(f):
+    """Markdown：只读取表格分隔行之后的数据行，取第1列和第3列"""
+    return iter_oriented(iter_markdown_cells(f))
+
+
+def iter_markdown_cells(f):
+    table_started = False
+    rejected = 0
+    for line in f:
+        line = line.strip()
+        # 跳过空行
+        if not line:
+            continue
+
+        # 检查是否是表格分隔行（包含|----|----|----|格式）
+        if '|' in line and all(cell == '' or cell == '-' * len(cell) for cell in split_markdown_row(line)):
+            table_started = True
+            continue
+
+        # 只处理表格数据行
+        if table_started and line.startswith('|'):
+            cells = [cell for cell in split_markdown_row(line) if cell]
+            if len(cells) >= 3:
+                yield cells[0], cells[2]
+            else:
+                rejected += 1
+    count('rows_rejected', rejected)
+
+
+def iter_text_words(f):
+    """TXT：按开头样本判断分隔符后逐行解析"""
+    return SUITE_LINE_FORMATS.iter_parsed(f)
+
+
+# 扩展名 -> 学习工具的整文件解析函数（参数为打开的文本文件）
+FILE_FORMATS = {
+    '.csv': iter_csv_words,
+    '.md': iter_markdown_words,
+    '.txt': iter_text_words,
+}
+
+
+def file_format(file_path):
+    """根据扩展名返回文件的格式解析函数，不支持时返回None"""
+    lower = file_path.lower()
+    for ext, handler in FILE_FORMATS.items():
+        if lower.endswith(ext):
+            return handler
+    return None
+
+
+def iter_progress(f, progress):
+    """逐行读取打开的文本文件，每隔PROGRESS_LINES行汇报已读取的字节比例"""
+    total = os.fstat(f.fileno()).st_size or 1
+    for index, line in enumerate(f, 1):
+        yield line
+        if index % PROGRESS_LINES == 0:
+            progress(min(f.buffer.tell() / total, 1.0))
+    progress(1.0)
+
+
+def iter_file_words(file_path, progress=None):
+    """按扩展名选择格式，逐条产出学习工具使用的单词
+
+    progress: 可选回调，参数为已读取的字节比例（0~1）
+    """
+    handler = file_format(file_path)
+    if handler is None:
+        raise ValueError(f"不支持的文件格式: {file_path}")
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from handler(iter_progress(f, progress) if progress else f)
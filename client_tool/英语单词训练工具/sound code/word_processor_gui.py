@@ -3,67 +3,88 @@ import os
 from pathlib import Path
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QPushButton, QLabel, QFileDialog, 
-                           QMessageBox, QProgressBar, QGroupBox, QCheckBox)
+                           QMessageBox, QProgressBar, QGroupBox, QCheckBox, QTextEdit)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 
 # 导入现有的单词处理器类
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from slove_tool import WordProcessor
+from perf_trace import span, summary
+from word_processor_nogui import (WordProcessor, batch_output_dirs, collect_batch_inputs,
+                                  convert_batch, is_batch_source)
 
 class ProcessingThread(QThread):
-    """处理文件的线程，避免UI卡顿"""
+    """处理文件的线程，避免UI卡顿
+    
+    input_file为目录或通配符时批量转换，每个文件完成后发出file_finished信号
+    """
     
     progress = pyqtSignal(int)
     finished = pyqtSignal(bool, str)
+    # 批量转换中一个文件完成：(输入文件, 单词数量（失败时为-1）, 错误信息)
+    file_finished = pyqtSignal(str, int, str)
     
-    def __init__(self, processor, input_file, output_dir, formats):
+    def __init__(self, processor, input_file, output_dir, formats, align_markdown=False):
         super().__init__()
         self.processor = processor
         self.input_file = input_file
         self.output_dir = output_dir
         self.formats = formats
+        self.align_markdown = align_markdown
     
     def run(self):
+        # 在计时结束后才发出完成信号，界面显示的性能汇总包含整个转换过程
+        with span('convert', file=os.path.basename(self.input_file)):
+            success, message = self.process()
+        self.finished.emit(success, message)
+    
+    def process(self):
+        """转换文件，返回(是否成功, 提示信息)"""
+        if is_batch_source(self.input_file):
+            return self.process_batch()
         try:
-            # 加载文件
-            self.progress.emit(10)
-            if not self.processor.load_from_file(self.input_file):
-                self.finished.emit(False, "加载文件失败，请检查文件格式")
-                return
-            
-            self.progress.emit(30)
-            
             # 创建输出目录
             output_path = Path(self.output_dir)
             output_path.mkdir(exist_ok=True)
+            self.progress.emit(10)
             
-            # 转换为不同格式
-            success_count = 0
-            total_formats = len(self.formats)
-            
-            if 'markdown' in self.formats:
-                self.processor.to_markdown(output_path / 'words.md')
-                success_count += 1
-                self.progress.emit(30 + 70 * success_count // total_formats)
-            
-            if 'csv' in self.formats:
-                self.processor.to_csv(output_path / 'words.csv')
-                success_count += 1
-                self.progress.emit(30 + 70 * success_count // total_formats)
-            
-            if 'json' in self.formats:
-                self.processor.to_json(output_path / 'words.json')
-                success_count += 1
-                self.progress.emit(30 + 70 * success_count // total_formats)
+            # 边读取边写出所有选中的格式，只遍历一次输入文件
+            count = self.processor.convert_file(
+                self.input_file, output_path, self.formats,
+                progress=lambda fraction: self.progress.emit(10 + int(90 * fraction)),
+                align_markdown=self.align_markdown
+            )
+            if count is None:
+                return False, "加载文件失败，请检查文件格式"
             
-            if 'txt' in self.formats:
-                self.processor.to_txt(output_path / 'words.txt')
-                success_count += 1
-                self.progress.emit(100)
+            self.progress.emit(100)
+            return True, f"成功转换 {len(self.formats)} 个格式的文件，共 {count} 个单词！"
+        except Exception as e:
+            return False, f"处理过程中出错: {str(e)}"
+    
+    def process_batch(self):
+        """并行转换目录或通配符匹配到的所有文件，每个文件写入输出目录下各自的子目录"""
+        try:
+            inputs, root = collect_batch_inputs(self.input_file, exclude=self.output_dir)
+            if not inputs:
+                return False, "没有找到可转换的文件（.txt、.csv、.md）"
             
-            self.finished.emit(True, f"成功转换 {success_count} 个格式的文件！")
+            results = convert_batch(inputs, batch_output_dirs(inputs, root, self.output_dir),
+                                    self.formats, self.align_markdown, on_file=self.file_done)
         except Exception as e:
-            self.finished.emit(False, f"处理过程中出错: {str(e)}")
+            return False, f"处理过程中出错: {str(e)}"
+        
+        failed = [error for _, _, error in results if error is not None]
+        words = sum(count for _, count, error in results if error is None)
+        if len(failed) == len(results):
+            return False, f"{len(results)} 个文件全部转换失败，例如：{failed[0]}"
+        message = f"成功转换 {len(results) - len(failed)} 个文件，共 {words} 个单词！"
+        if failed:
+            message += f"\n{len(failed)} 个文件转换失败，详见列表"
+        return True, message
+    
+    def file_done(self, done, total, input_path, count, error):
+        self.progress.emit(int(100 * done / total))
+        self.file_finished.emit(input_path, -1 if error else count, error or '')
 
 class WordProcessorGUI(QMainWindow):
     def __init__(self):
@@ -105,8 +126,14 @@ class WordProcessorGUI(QMainWindow):
         browse_button.clicked.connect(self.browse_input_file)
         browse_button.setMinimumWidth(100)
         
+        # 选择文件夹时批量转换其中的所有单词文件
+        browse_dir_button = QPushButton("浏览文件夹")
+        browse_dir_button.clicked.connect(self.browse_input_dir)
+        browse_dir_button.setMinimumWidth(100)
+        
         input_layout.addWidget(self.input_file_label, 1)
         input_layout.addWidget(browse_button)
+        input_layout.addWidget(browse_dir_button)
         
         # 输出目录选择
         output_layout = QHBoxLayout()
@@ -141,10 +168,24 @@ class WordProcessorGUI(QMainWindow):
         self.txt_checkbox = QCheckBox("文本 (.txt)")
         self.txt_checkbox.setChecked(True)
         
+        # 学习工具可以直接加载数据库；Anki卡组由数据库生成，选中时也会写出数据库
+        self.sqlite_checkbox = QCheckBox("SQLite (.db)")
+        self.sqlite_checkbox.setChecked(False)
+        
+        self.anki_checkbox = QCheckBox("Anki卡组 (.txt)")
+        self.anki_checkbox.setChecked(False)
+        
         format_layout.addWidget(self.md_checkbox)
         format_layout.addWidget(self.csv_checkbox)
         format_layout.addWidget(self.json_checkbox)
         format_layout.addWidget(self.txt_checkbox)
+        format_layout.addWidget(self.sqlite_checkbox)
+        format_layout.addWidget(self.anki_checkbox)
+        
+        # Markdown表格按列宽对齐（需要额外扫描一遍文件）
+        self.align_checkbox = QCheckBox("对齐表格")
+        self.align_checkbox.setChecked(False)
+        format_layout.addWidget(self.align_checkbox)
         format_group.setLayout(format_layout)
         
         # 创建处理按钮
@@ -170,6 +211,12 @@ class WordProcessorGUI(QMainWindow):
         self.status_label.setStyleSheet("color: green; font-weight: bold")
         main_layout.addWidget(self.status_label)
         
+        # 批量转换时逐个列出每个文件的结果
+        self.file_log = QTextEdit()
+        self.file_log.setReadOnly(True)
+        self.file_log.setVisible(False)
+        main_layout.addWidget(self.file_log)
+        
     def browse_input_file(self):
         """浏览并选择输入文件"""
         file_path, _ = QFileDialog.getOpenFileName(
@@ -184,6 +231,16 @@ class WordProcessorGUI(QMainWindow):
             self.input_file_label.setStyleSheet("color: green; font-weight: bold")
             self.status_label.setText("")
     
+    def browse_input_dir(self):
+        """选择文件夹，批量转换其中的所有单词文件"""
+        dir_path = QFileDialog.getExistingDirectory(self, "选择单词文件所在的文件夹")
+        
+        if dir_path:
+            self.input_file = dir_path
+            self.input_file_label.setText(f"已选择文件夹: {os.path.basename(dir_path) or dir_path}")
+            self.input_file_label.setStyleSheet("color: green; font-weight: bold")
+            self.status_label.setText("")
+    
     def browse_output_dir(self):
         """浏览并选择输出目录"""
         dir_path = QFileDialog.getExistingDirectory(
@@ -205,6 +262,10 @@ class WordProcessorGUI(QMainWindow):
             formats.append('json')
         if self.txt_checkbox.isChecked():
             formats.append('txt')
+        if self.sqlite_checkbox.isChecked():
+            formats.append('sqlite')
+        if self.anki_checkbox.isChecked():
+            formats.append('anki')
         return formats
     
     def start_processing(self):
@@ -224,19 +285,32 @@ class WordProcessorGUI(QMainWindow):
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
         self.status_label.setText("正在处理...")
+        self.status_label.setStyleSheet("color: green; font-weight: bold")
+        self.file_log.clear()
+        self.file_log.setVisible(is_batch_source(self.input_file))
         
         # 创建处理线程
         self.thread = ProcessingThread(
-            self.processor, self.input_file, self.output_dir, formats
+            self.processor, self.input_file, self.output_dir, formats,
+            self.align_checkbox.isChecked()
         )
         self.thread.progress.connect(self.update_progress)
         self.thread.finished.connect(self.processing_finished)
+        self.thread.file_finished.connect(self.file_finished)
         self.thread.start()
     
     def update_progress(self, value):
         """更新进度条"""
         self.progress_bar.setValue(value)
     
+    def file_finished(self, input_path, count, error):
+        """批量转换中一个文件完成"""
+        name = os.path.basename(input_path)
+        if error:
+            self.file_log.append(f"✗ {name}：{error}")
+        else:
+            self.file_log.append(f"✓ {name}：{count} 个单词")
+    
     def processing_finished(self, success, message):
         """处理完成后的操作"""
         # 恢复界面状态
@@ -245,7 +319,9 @@ class WordProcessorGUI(QMainWindow):
         
         # 显示结果
         if success:
-            self.status_label.setText(message)
+            # 启用性能记录时在状态中附上耗时和计数汇总
+            trace = summary()
+            self.status_label.setText(f"{message}\n{trace}" if trace else message)
             QMessageBox.information(self, "成功", f"转换完成！\n{message}\n文件已保存在：{self.output_dir}")
         else:
             self.status_label.setText("转换失败")
@@ -1,60 +1,140 @@
+import os
 import json
 import csv
+import glob
+import unicodedata
 from pathlib import Path
+from types import SimpleNamespace
+
+from chunked_loader import parse_file_parallel
+from mapped_loader import MappedWordFile, scan_pos_line
+from perf_trace import count, span
+from word_database import WordDatabaseWriter, export_anki
+from word_store import WordStore
+from word_parser import PROCESSOR_LINE_FORMATS, parse_pos_line
+
+# 输出文件的缓冲区大小，以及写出器攒够多少行再批量写入
+BUFFER_SIZE = 1024 * 1024
+BATCH_SIZE = 1000
+# 每处理多少行汇报一次进度
+PROGRESS_EVERY = 10000
+
+# 单词数据的字段
+WORD_KEYS = ('word', 'pos', 'meaning')
 
 class WordProcessor:
     def __init__(self):
-        self.words = []
+        self.words = self.new_store()
+    
+    @staticmethod
+    def new_store(words=()):
+        """创建空的单词存储，词性取值重复度高，按编号驻留"""
+        return WordStore(WORD_KEYS, words, interned=('pos',))
     
     def parse_line(self, line):
         """解析单行单词数据"""
-        line = line.strip()
-        if not line:
-            return None
-            
-        # 分离单词和释义
-        parts = line.split(' ', 1)
-        if len(parts) < 2:
-            return None
-            
-        word = parts[0]
-        definition = parts[1]
+        return parse_pos_line(line)
+    
+    def iter_words(self, file_path, progress=None, counted=True):
+        """逐行解析文件并依次产出单词数据，不在内存中保留全部结果
+        
+        progress: 可选回调，参数为已读取的字节比例（0~1）
+        counted: 是否计入性能记录的解析行数（额外扫描一遍文件时为False）
+        """
+        parsed_rows = rejected_rows = 0
+        with open(file_path, 'r', encoding='utf-8') as f:
+            total = os.fstat(f.fileno()).st_size or 1
+            # 先用开头若干行判断格式，之后整个文件只走该格式的解析
+            parser, lines = PROCESSOR_LINE_FORMATS.sniff_stream(f)
+            for index, line in enumerate(lines):
+                parsed = parser(line)
+                if parsed:
+                    parsed_rows += 1
+                    yield parsed
+                elif line.strip():
+                    rejected_rows += 1
+                if progress and index % PROGRESS_EVERY == 0:
+                    progress(min(f.buffer.tell() / total, 1.0))
+        if counted:
+            count('rows_parsed', parsed_rows)
+            count('rows_rejected', rejected_rows)
+        if progress:
+            progress(1.0)
+    
+    def load_from_file(self, file_path, workers=1, mapped=False):
+        """从文件加载单词数据
         
-        # 分离词性和释义
-        if '.' in definition:
-            pos, meaning = definition.split('.', 1)
-            return {
-                'word': word,
-                'pos': pos.strip(),
-                'meaning': meaning.strip()
-            }
-        return None
-    
-    def load_from_file(self, file_path):
-        """从文件加载单词数据"""
-        self.words = []
+        workers大于1时把文件按行边界切块，用多个进程并行解析；
+        mapped为True时用内存映射只读加载，导出时才解码每个单词（仅支持"单词 词性.释义"格式）
+        """
+        self.close()
+        self.words = self.new_store()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    parsed = self.parse_line(line)
-                    if parsed:
-                        self.words.append(parsed)
+            parser = PROCESSOR_LINE_FORMATS.sniff_file(file_path)
+            if mapped and parser.parse is parse_pos_line:
+                self.words = MappedWordFile(file_path, WORD_KEYS, scan_pos_line)
+            elif workers > 1:
+                self.words.extend(parse_file_parallel(file_path, parser, workers))
+            else:
+                self.words.extend(self.iter_words(file_path))
+                return True
+            # iter_words自己统计解析行数，其余方式在这里补上（无法解析的行已在解析时统计）
+            count('rows_parsed', len(self.words))
             return True
         except Exception as e:
             print(f"Error loading file: {e}")
             return False
     
-    def to_markdown(self, output_path):
-        """转换为Markdown表格格式"""
-        markdown = "| 单词 | 词性 | 释义 |\n"
-        markdown += "|------|------|------|\n"
+    def close(self):
+        """释放内存映射加载时占用的文件"""
+        if isinstance(self.words, MappedWordFile):
+            self.words.close()
+            self.words = self.new_store()
+    
+    def convert_file(self, input_path, output_dir, formats=None, progress=None,
+                     align_markdown=False):
+        """流式转换：边解析边写出所有选中的格式，只遍历一次输入文件
         
-        for word in self.words:
-            markdown += f"| {word['word']} | {word['pos']} | {word['meaning']} |\n"
+        align_markdown为True时先额外扫描一遍文件计算Markdown列宽
+        返回写出的单词数量，失败时返回None
+        """
+        try:
+            return self.convert(input_path, output_dir, formats, progress, align_markdown)
+        except Exception as e:
+            print(f"Error converting file: {e}")
+            return None
+    
+    def convert(self, input_path, output_dir, formats=None, progress=None, align_markdown=False):
+        """与convert_file相同，但出错时直接抛出异常"""
+        engine = ExportEngine(output_dir, formats)
+        if align_markdown and 'markdown' in engine.formats:
+            with span('measure_markdown'):
+                engine.markdown_widths = MarkdownWriter.measure(self.iter_words(input_path, counted=False))
+        with span('convert_file', formats=','.join(engine.formats)):
+            return engine.run(self.iter_words(input_path, progress))
+    
+    def export(self, output_dir, formats=None, progress=None, align_markdown=False):
+        """把已加载的单词一次性导出为所有选中的格式
         
+        返回写出的单词数量，失败时返回None
+        """
+        total = len(self.words) or 1
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(markdown)
+            engine = ExportEngine(output_dir, formats)
+            if align_markdown and 'markdown' in engine.formats:
+                engine.markdown_widths = MarkdownWriter.measure(self.words)
+            return engine.run(self.words, progress and (lambda written: progress(written / total)))
+        except Exception as e:
+            print(f"Error exporting words: {e}")
+            return None
+    
+    def to_markdown(self, output_path, align=False):
+        """转换为Markdown表格格式，align为True时按列宽对齐"""
+        try:
+            widths = MarkdownWriter.measure(self.words) if align else None
+            with MarkdownWriter(output_path, widths) as writer:
+                for word in self.words:
+                    writer.write(word)
             return True
         except Exception as e:
             print(f"Error saving markdown: {e}")
@@ -63,10 +143,9 @@ class WordProcessor:
     def to_csv(self, output_path):
         """转换为CSV格式"""
         try:
-            with open(output_path, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['word', 'pos', 'meaning'])
-                writer.writeheader()
-                writer.writerows(self.words)
+            with CSVWriter(output_path) as writer:
+                for word in self.words:
+                    writer.write(word)
             return True
         except Exception as e:
             print(f"Error saving CSV: {e}")
@@ -75,43 +154,429 @@ class WordProcessor:
     def to_json(self, output_path):
         """转换为JSON格式"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(self.words, f, ensure_ascii=False, indent=2)
+            with JSONWriter(output_path) as writer:
+                for word in self.words:
+                    writer.write(word)
             return True
         except Exception as e:
             print(f"Error saving JSON: {e}")
             return False
     
+    def to_sqlite(self, output_path):
+        """转换为SQLite数据库"""
+        try:
+            with SQLiteWriter(output_path) as writer:
+                for word in self.words:
+                    writer.write(word)
+            return True
+        except Exception as e:
+            print(f"Error saving SQLite: {e}")
+            return False
+    
     def to_txt(self, output_path, separator='|'):
         """转换为带分隔符的文本格式"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
+            with TXTWriter(output_path, separator) as writer:
                 for word in self.words:
-                    f.write(f"{word['word']}{separator}{word['pos']}{separator}{word['meaning']}\n")
+                    writer.write(word)
             return True
         except Exception as e:
             print(f"Error saving TXT: {e}")
             return False
 
+
+class WordWriter:
+    """流式写出器基类：逐条写入单词，攒够一批后再批量写入文件"""
+    
+    newline = None
+    
+    def __init__(self, output_path, buffer_size=BUFFER_SIZE):
+        self.file = open(output_path, 'w', encoding='utf-8',
+                         newline=self.newline, buffering=buffer_size)
+        self.pending = []
+        self.write_header()
+    
+    def write_header(self):
+        pass
+    
+    def write_footer(self):
+        pass
+    
+    def write(self, word):
+        raise NotImplementedError
+    
+    def emit(self, text):
+        """把一段文本放入待写队列"""
+        self.pending.append(text)
+        if len(self.pending) >= BATCH_SIZE:
+            self.flush()
+    
+    def flush(self):
+        if self.pending:
+            self.file.writelines(self.pending)
+            self.pending.clear()
+    
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            self.write_footer()
+            self.flush()
+        finally:
+            self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def display_width(text):
+    """文本在等宽字体下的显示宽度，中日韩全角字符占两格"""
+    if text.isascii():
+        return len(text)
+    return sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1 for c in text)
+
+
+def escape_markdown_cell(text):
+    """转义单元格中的竖线，避免破坏表格结构"""
+    return text.replace('|', '\\|')
+
+
+class MarkdownWriter(WordWriter):
+    """Markdown表格写出器
+    
+    widths为(单词, 词性, 释义)三列的显示宽度，传入时按列宽补齐空格对齐表格
+    """
+    
+    headers = ('单词', '词性', '释义')
+    keys = ('word', 'pos', 'meaning')
+    
+    def __init__(self, output_path, widths=None, buffer_size=BUFFER_SIZE):
+        self.widths = widths
+        super().__init__(output_path, buffer_size)
+    
+    @classmethod
+    def measure(cls, words):
+        """预扫描一遍数据，计算各列对齐所需的显示宽度"""
+        widths = [display_width(header) for header in cls.headers]
+        for word in words:
+            for i, key in enumerate(cls.keys):
+                width = display_width(escape_markdown_cell(word[key]))
+                if width > widths[i]:
+                    widths[i] = width
+        return tuple(widths)
+    
+    def format_row(self, cells):
+        if self.widths:
+            cells = [cell + ' ' * (width - display_width(cell))
+                     for cell, width in zip(cells, self.widths)]
+        return '| ' + ' | '.join(cells) + ' |\n'
+    
+    def write_header(self):
+        self.emit(self.format_row(self.headers))
+        if self.widths:
+            self.emit('|' + '|'.join('-' * (width + 2) for width in self.widths) + '|\n')
+        else:
+            self.emit("|------|------|------|\n")
+    
+    def write(self, word):
+        self.emit(self.format_row([escape_markdown_cell(word[key]) for key in self.keys]))
+
+
+class CSVWriter(WordWriter):
+    """CSV写出器"""
+    
+    newline = ''
+    
+    def write_header(self):
+        # csv模块只需要一个带write方法的对象，直接写进待写队列
+        self.writer = csv.DictWriter(SimpleNamespace(write=self.emit),
+                                     fieldnames=['word', 'pos', 'meaning'])
+        self.writer.writeheader()
+    
+    def write(self, word):
+        self.writer.writerow(word)
+
+
+class JSONWriter(WordWriter):
+    """JSON数组写出器：逐个元素写出，结果与json.dump(indent=2)一致"""
+    
+    def write_header(self):
+        self.count = 0
+    
+    def write(self, word):
+        if not isinstance(word, dict):
+            word = dict(word)
+        item = json.dumps(word, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        self.emit(('[\n  ' if self.count == 0 else ',\n  ') + item)
+        self.count += 1
+    
+    def write_footer(self):
+        self.emit('\n]' if self.count else '[]')
+
+
+class TXTWriter(WordWriter):
+    """带分隔符的文本写出器"""
+    
+    def __init__(self, output_path, separator='|', buffer_size=BUFFER_SIZE):
+        self.separator = separator
+        super().__init__(output_path, buffer_size)
+    
+    def write(self, word):
+        sep = self.separator
+        self.emit(f"{word['word']}{sep}{word['pos']}{sep}{word['meaning']}\n")
+
+
+class SQLiteWriter(WordWriter):
+    """SQLite数据库写出器：攒够一批后用executemany插入，全部在一个事务中完成，最后建索引"""
+    
+    def __init__(self, output_path, buffer_size=BUFFER_SIZE):
+        self.database = WordDatabaseWriter(output_path)
+        self.pending = []
+    
+    def write(self, word):
+        self.emit((word['word'], word['pos'], word['meaning']))
+    
+    def flush(self):
+        if self.pending:
+            self.database.insert(self.pending)
+            self.pending.clear()
+    
+    def close(self):
+        if self.database.db is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.database.close()
+
+
+# 格式名称 -> (写出器类, 默认输出文件名)；写出器为None的格式在其他格式写完后生成
+FORMAT_WRITERS = {
+    'markdown': (MarkdownWriter, 'words.md'),
+    'csv': (CSVWriter, 'words.csv'),
+    'json': (JSONWriter, 'words.json'),
+    'txt': (TXTWriter, 'words.txt'),
+    'sqlite': (SQLiteWriter, 'words.db'),
+    'anki': (None, 'words_anki.txt'),
+}
+
+# 未指定格式时导出的格式
+DEFAULT_FORMATS = ('markdown', 'csv', 'json', 'txt')
+
+# 导出时先写入的临时文件的后缀，全部写完后再替换正式的输出文件
+TEMP_SUFFIX = '.part'
+
+class ExportEngine:
+    """多格式导出引擎：只遍历一次单词数据，把每条记录同时推送给所有选中格式的写出器"""
+    
+    def __init__(self, output_dir, formats=None, markdown_widths=None):
+        self.output_dir = Path(output_dir)
+        self.formats = list(formats or DEFAULT_FORMATS)
+        # Anki卡组由SQLite数据库生成，选择Anki时同时写出数据库
+        if 'anki' in self.formats and 'sqlite' not in self.formats:
+            self.formats.append('sqlite')
+        # Markdown表格的列宽，为None时不对齐
+        self.markdown_widths = markdown_widths
+    
+    def output_paths(self):
+        """各格式对应的输出文件路径"""
+        return {fmt: self.output_dir / FORMAT_WRITERS[fmt][1] for fmt in self.formats}
+    
+    def run(self, words, progress=None):
+        """把words中的每条记录写入所有格式，返回写出的数量
+        
+        progress: 可选回调，每处理PROGRESS_EVERY条调用一次，参数为已写出数量
+        先写入临时文件，全部成功后才替换原有的输出文件；
+        输入文件不存在、无法解码或中途出错时，上次的转换结果保持不变
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        paths = self.output_paths()
+        temp_paths = {fmt: path.with_name(path.name + TEMP_SUFFIX) for fmt, path in paths.items()}
+        try:
+            written = self.write_streams(words, temp_paths, progress)
+            if 'anki' in temp_paths:
+                with span('export_anki'):
+                    export_anki(temp_paths['sqlite'], temp_paths['anki'])
+            for fmt, path in paths.items():
+                os.replace(temp_paths[fmt], path)
+        finally:
+            for temp_path in temp_paths.values():
+                if temp_path.exists():
+                    temp_path.unlink()
+        return written
+    
+    def write_streams(self, words, paths, progress=None):
+        """把每条记录推送给所有流式写出器"""
+        writers = []
+        try:
+            for fmt, path in paths.items():
+                if fmt == 'markdown':
+                    writers.append(MarkdownWriter(path, self.markdown_widths))
+                elif FORMAT_WRITERS[fmt][0] is not None:
+                    writers.append(FORMAT_WRITERS[fmt][0](path))
+            
+            write_all = [writer.write for writer in writers]
+            written = 0
+            for word in words:
+                for write in write_all:
+                    write(word)
+                written += 1
+                if progress and written % PROGRESS_EVERY == 0:
+                    progress(written)
+            if progress:
+                progress(written)
+            return written
+        finally:
+            for writer in writers:
+                writer.close()
+
+
+# ---------------------------------------------------------------- 批量转换
+
+# 批量转换时读取的输入文件类型
+BATCH_EXTENSIONS = ('.txt', '.csv', '.md')
+
+
+def is_batch_source(source):
+    """输入是目录或通配符时按批量转换处理
+
+    已存在的文件总是单独转换，文件名中的*?[（如"Unit 1 [A].txt"）不当作通配符
+    """
+    if os.path.isfile(source):
+        return False
+    return os.path.isdir(source) or any(char in source for char in '*?[')
+
+
+def collect_batch_inputs(source, exclude=None):
+    """展开批量转换的输入，返回(按路径排序的输入文件列表, 计算输出相对路径的根目录)
+
+    目录取其中的单词文件（不含子目录），否则按通配符匹配（**可匹配多层子目录）；
+    exclude目录（通常是输出目录）中的文件不作为输入，避免把上次的转换结果再转换一遍
+    """
+    if os.path.isdir(source):
+        root = source
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        root = None
+        paths = glob.glob(source, recursive=True)
+    exclude = os.path.abspath(exclude) if exclude else None
+    inputs = sorted(path for path in paths
+                    if os.path.isfile(path) and path.lower().endswith(BATCH_EXTENSIONS)
+                    and not (exclude and os.path.abspath(path).startswith(exclude + os.sep)))
+    if root is None:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in inputs]) if inputs else '.'
+    return inputs, root
+
+
+def batch_output_dirs(inputs, root, output_dir):
+    """每个输入文件的输出目录：输出目录下与输入相同的相对路径（去掉扩展名）
+
+    同名不同扩展名的文件（如a.txt和a.csv）在目录名后加上扩展名区分，仍然重名时再加序号；
+    比较时不区分大小写，避免在Windows上写到同一个目录
+    """
+    used = set()
+    dirs = []
+    for path in inputs:
+        base, ext = os.path.splitext(os.path.relpath(os.path.abspath(path), os.path.abspath(root)))
+        name = base
+        if name.lower() in used:
+            name = f"{base}_{ext[1:]}"
+        number = 2
+        while name.lower() in used:
+            name = f"{base}_{ext[1:]}_{number}"
+            number += 1
+        used.add(name.lower())
+        dirs.append(os.path.join(output_dir, name))
+    return dirs
+
+
+def convert_one(input_path, output_dir, formats=None, align_markdown=False):
+    """批量转换中的一个文件（可在子进程中运行），返回写出的单词数量，出错时抛出异常"""
+    return WordProcessor().convert(input_path, output_dir, formats, align_markdown=align_markdown)
+
+
+def convert_batch(inputs, output_dirs, formats=None, align_markdown=False, workers=None, on_file=None):
+    """把多个文件分别转换到各自的输出目录，返回[(输入文件, 单词数量, 错误信息), ...]（按完成顺序）
+
+    多于一个文件时在进程池中并行转换，同时运行的进程数不超过workers（默认按CPU核数）；
+    单个文件失败只记录错误信息（成功时为None），不影响其余文件。
+    on_file(已完成数, 总数, 输入文件, 单词数量, 错误信息)在每个文件完成后调用，
+    回调抛出异常时尚未开始的文件不再转换
+    """
+    total = len(inputs)
+    if workers is None:
+        workers = min(total, os.cpu_count() or 1)
+    results = []
+
+    def finish(input_path, word_count, error):
+        results.append((input_path, word_count, error))
+        if on_file:
+            on_file(len(results), total, input_path, word_count, error)
+
+    with span('convert_batch', files=total, workers=workers):
+        if workers <= 1 or total <= 1:
+            for input_path, output_dir in zip(inputs, output_dirs):
+                try:
+                    word_count = convert_one(input_path, output_dir, formats, align_markdown)
+                except Exception as e:
+                    finish(input_path, None, str(e))
+                else:
+                    finish(input_path, word_count, None)
+            return results
+
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(convert_one, input_path, output_dir, formats, align_markdown): input_path
+                       for input_path, output_dir in zip(inputs, output_dirs)}
+            try:
+                for future in as_completed(futures):
+                    try:
+                        word_count = future.result()
+                    except Exception as e:
+                        finish(futures[future], None, str(e))
+                    else:
+                        finish(futures[future], word_count, None)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    return results
+
+
 def main():
     # 创建处理器实例
     processor = WordProcessor()
     
     # 从文件读取数据
-    input_file = input("请输入文件路径（支持.txt和.csv格式): ")
-    if processor.load_from_file(input_file):
-        print(f"成功从 {input_file} 加载 {len(processor.words)} 个单词")
-        
-        # 创建输出目录
-        output_dir = Path('output')
-        output_dir.mkdir(exist_ok=True)
+    input_file = input("请输入文件路径（支持.txt和.csv格式，也可以是目录或通配符如 lists/*.txt）: ")
+    
+    output_dir = Path('output')
+    if is_batch_source(input_file):
+        # 批量转换：每个输入文件写入output下各自的子目录
+        inputs, root = collect_batch_inputs(input_file, exclude=output_dir)
+        if not inputs:
+            print("没有找到可转换的文件")
+            return
         
-        # 转换为不同格式
-        processor.to_markdown(output_dir / 'words.md')
-        processor.to_csv(output_dir / 'words.csv')
-        processor.to_json(output_dir / 'words.json')
-        processor.to_txt(output_dir / 'words.txt')
+        def report(done, total, input_path, word_count, error):
+            if error is None:
+                print(f"[{done}/{total}] {input_path}: {word_count} 个单词")
+            else:
+                print(f"[{done}/{total}] {input_path}: 失败 - {error}")
         
+        results = convert_batch(inputs, batch_output_dirs(inputs, root, output_dir), on_file=report)
+        failed = sum(1 for _, _, error in results if error is not None)
+        print(f"转换完成！成功 {len(results) - failed} 个文件，失败 {failed} 个，结果保存在output目录中。")
+        return
+    
+    # 边读取边转换为不同格式，内存占用与文件大小无关
+    word_count = processor.convert_file(input_file, output_dir)
+    if word_count is not None:
+        print(f"成功从 {input_file} 转换 {word_count} 个单词")
         print("转换完成!文件已保存在output目录中。")
     else:
         print("加载文件失败")
@@ -0,0 +1,201 @@
+import heapq
+import random
+import time
+
+# 新卡片的初始难度系数（SM-2）
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+DAY = 24 * 60 * 60
+# 答错或跳过的单词在本次学习中隔多久再出现（秒）
+RELEARN_DELAY = 60
+
+# 答题质量（SM-2的0~5分）
+QUALITY_WRONG = 1
+QUALITY_HARD = 3  # 看过答案后答对
+QUALITY_GOOD = 4
+
+
+class Card:
+    """一个英文单词的复习状态；同一个英文单词的多个条目共用一张卡片"""
+
+    __slots__ = ('ease', 'interval', 'reps', 'due')
+
+    def __init__(self, ease=INITIAL_EASE, interval=0.0, reps=0, due=0.0):
+        self.ease = ease
+        self.interval = interval  # 天
+        self.reps = reps          # 连续答对次数，0表示还没有学会
+        self.due = due            # 到期时间（时间戳）
+
+    def state(self):
+        """保存到数据库的字段"""
+        return self.ease, self.interval, self.reps, self.due
+
+
+class ReviewScheduler:
+    """SM-2间隔重复调度
+
+    单词用ID（在单词存储中的下标）表示，复习状态按英文单词记录。
+    出现过的单词才建立卡片，按到期时间放在一个小根堆中，取下一个到期单词、评分后重新入堆都是O(log n)；
+    评分后堆中旧的条目不删除，出堆时发现与卡片当前的到期时间不符就跳过。
+    从没出现过的新单词放在池子里，没有到期的复习时才从中随机取出（与末尾交换后弹出，O(1)）。
+    """
+
+    def __init__(self, keys=(), learned=(), reviews=None, clock=time.time):
+        self.clock = clock
+        self.load(keys, learned, reviews)
+
+    def load(self, keys, learned=(), reviews=None):
+        """keys[i]为ID为i的单词的标识（英文单词）
+
+        reviews为{英文单词: (ease, interval, reps, due)}，保存过的复习状态；
+        只在learned中、没有复习状态的单词（旧版本学会的单词）视为学会过一次，立即安排复习
+        """
+        keys = list(keys)
+        reviews = reviews or {}
+        # 英文单词 -> 第一次出现的ID；倒序构建，后写入的较小ID覆盖较大的
+        self.first_ids = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+        # 同一个英文单词出现多次时，记录它的全部ID
+        self.duplicate_ids = {}
+        if len(self.first_ids) < len(keys):
+            ids_by_key = {}
+            for word_id, key in enumerate(keys):
+                ids_by_key.setdefault(key, []).append(word_id)
+            self.duplicate_ids = {key: ids for key, ids in ids_by_key.items() if len(ids) > 1}
+
+        self.cards = {}
+        for key, state in reviews.items():
+            if key in self.first_ids:
+                self.cards[key] = Card(*state)
+        now = self.clock()
+        for key in learned:
+            if key in self.first_ids and key not in self.cards:
+                self.cards[key] = Card(interval=1.0, reps=1, due=now)
+
+        self.heap = [(card.due, index, key) for index, (key, card) in enumerate(self.cards.items())]
+        heapq.heapify(self.heap)
+        self.counter = len(self.heap)
+        cards = self.cards
+        self.new = [key for key in self.first_ids if key not in cards]
+        self.unlearned = len(self.first_ids) - sum(1 for card in cards.values() if card.reps)
+
+    def push(self, key, card):
+        self.counter += 1
+        heapq.heappush(self.heap, (card.due, self.counter, key))
+        # 过时条目太多时重建一次堆
+        if len(self.heap) > 2 * len(self.cards) + 1024:
+            self.heap = [entry for entry in self.heap if self.is_current(entry[0], entry[2])]
+            heapq.heapify(self.heap)
+
+    def is_current(self, due, key):
+        """堆中的条目是否仍然有效：单词还在词库中，且到期时间没有被评分改变"""
+        return key in self.first_ids and self.cards[key].due == due
+
+    def peek(self):
+        """堆顶的有效条目(到期时间, 英文单词)，顺便丢弃过时的条目；没有卡片时返回None"""
+        heap = self.heap
+        while heap:
+            due, _, key = heap[0]
+            if self.is_current(due, key):
+                return due, key
+            heapq.heappop(heap)
+        return None
+
+    def next(self):
+        """取出下一个单词的ID：先复习已到期的单词，再学新单词；都没有时返回None
+
+        取出的单词推迟RELEARN_DELAY秒，未作答就跳过时稍后会再次出现
+        """
+        now = self.clock()
+        top = self.peek()
+        if top is not None and top[0] <= now:
+            key = top[1]
+            card = self.cards[key]
+        else:
+            key = self.take_new()
+            if key is None:
+                return None
+            card = self.cards[key] = Card()
+        card.due = now + RELEARN_DELAY
+        self.push(key, card)
+        if key in self.duplicate_ids:
+            return random.choice(self.duplicate_ids[key])
+        return self.first_ids[key]
+
+    def take_new(self):
+        """从新单词池中随机取出一个英文单词；池子里已经删除或出现过的单词直接丢弃"""
+        new = self.new
+        while new:
+            index = random.randrange(len(new))
+            new[index], new[-1] = new[-1], new[index]
+            key = new.pop()
+            if key in self.first_ids and key not in self.cards:
+                return key
+        return None
+
+    def next_due(self):
+        """最早的到期时间，没有卡片时返回None"""
+        top = self.peek()
+        return top and top[0]
+
+    def grade(self, key, quality):
+        """按SM-2规则为某个英文单词评分（0~5），返回更新后的卡片；单词还没出现过时返回None"""
+        card = self.cards.get(key)
+        if card is None:
+            return None
+        now = self.clock()
+        was_unlearned = card.reps == 0
+
+        if quality < 3:
+            # 答错：重新开始，本次学习中稍后再出现
+            card.reps = 0
+            card.interval = 0.0
+            card.due = now + RELEARN_DELAY
+        else:
+            if card.reps == 0:
+                card.interval = 1.0
+            elif card.reps == 1:
+                card.interval = 6.0
+            else:
+                card.interval = round(card.interval * card.ease, 2)
+            card.reps += 1
+            card.due = now + card.interval * DAY
+        card.ease = max(MIN_EASE, card.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+        self.unlearned += (card.reps == 0) - was_unlearned
+        self.push(key, card)
+        return card
+
+    def add_word(self, key, word_id):
+        """词库文件改动后新增的一条单词；英文单词删除前的复习状态继续沿用"""
+        if key in self.first_ids:
+            ids = self.duplicate_ids.setdefault(key, [self.first_ids[key]])
+            ids.append(word_id)
+            return
+        self.first_ids[key] = word_id
+        card = self.cards.get(key)
+        if card is None:
+            self.new.append(key)
+        else:
+            self.push(key, card)
+        if card is None or card.reps == 0:
+            self.unlearned += 1
+
+    def remove_word(self, key, word_id):
+        """词库文件改动后删除的一条单词；同一英文单词的条目全部删除后不再出题"""
+        ids = self.duplicate_ids.get(key)
+        if ids is not None:
+            ids.remove(word_id)
+            self.first_ids[key] = ids[0]
+            if len(ids) == 1:
+                del self.duplicate_ids[key]
+            return
+        if self.first_ids.get(key) != word_id:
+            return
+        del self.first_ids[key]
+        card = self.cards.get(key)
+        if card is None or card.reps == 0:
+            self.unlearned -= 1
+
+    def __len__(self):
+        """还没有学会的单词数"""
+        return self.unlearned
@@ -0,0 +1,107 @@
+import random
+from array import array
+
+
+class ExportSelector:
+    """某个导出模式下的抽词器
+
+    单词用ID（在单词存储中的下标）表示，未导出过的ID放在一个池子里，
+    pos记录每个ID在池中的位置（不在池中为-1），移出池子时与末尾交换，O(1)完成；
+    每套单词从池子末尾做部分Fisher-Yates洗牌抽取，不放回，耗时只与每套数量有关。
+    已导出的英文单词记录在exported集合中，可以与外部共享。
+    """
+
+    def __init__(self, keys, exported=None, rng=None, removed=()):
+        """keys[i]为ID为i的单词的标识（英文单词）；removed中的ID已从词库删除，不参与抽取"""
+        self.keys = keys
+        self.exported = exported if exported is not None else set()
+        self.rng = rng or random
+        self.removed = removed
+        # 同一个英文单词可能出现多次，导出时要一起移出池子
+        self.ids_by_key = {}
+        for word_id, key in enumerate(keys):
+            if word_id not in removed:
+                self.ids_by_key.setdefault(key, []).append(word_id)
+        self.pos = array('q', [-1]) * len(keys)
+        self.pool = []
+        self.fill_pool()
+
+    def fill_pool(self):
+        """把所有未导出的单词放回池子"""
+        exported = self.exported
+        removed = self.removed
+        self.pool = [i for i, key in enumerate(self.keys) if key not in exported and i not in removed]
+        pos = self.pos
+        for i in range(len(pos)):
+            pos[i] = -1
+        for index, word_id in enumerate(self.pool):
+            pos[word_id] = index
+
+    def remove(self, word_id):
+        """把某个ID移出池子"""
+        pool = self.pool
+        pos = self.pos
+        index = pos[word_id]
+        if index < 0:
+            return
+        last = pool.pop()
+        if last != word_id:
+            pool[index] = last
+            pos[last] = index
+        pos[word_id] = -1
+
+    def take(self, count):
+        """从池中随机不放回地取出count个ID"""
+        pool = self.pool
+        pos = self.pos
+        size = len(pool)
+        for j in range(count):
+            end = size - 1 - j
+            r = self.rng.randrange(end + 1)
+            pool[r], pool[end] = pool[end], pool[r]
+            pos[pool[r]] = r
+            pos[pool[end]] = end
+        taken = pool[size - count:]
+        del pool[size - count:]
+        for word_id in taken:
+            pos[word_id] = -1
+        return taken
+
+    def mark_exported(self, word_ids):
+        """记录这些单词已导出，并把同名的重复条目也移出池子"""
+        for word_id in word_ids:
+            key = self.keys[word_id]
+            if key in self.exported:
+                continue
+            self.exported.add(key)
+            for same_id in self.ids_by_key[key]:
+                self.remove(same_id)
+
+    def remaining(self):
+        """还没有导出过的单词数"""
+        return len(self.pool)
+
+    def select(self, count):
+        """抽取一套单词，返回(ID列表, 是否重置了已导出记录)
+
+        规则与原先一致：优先使用未导出的单词；全部导出过后清空记录重新开始；
+        未导出的单词不够一套时，用已导出的单词随机补足
+        """
+        need_reset = False
+        if not self.pool:
+            self.exported.clear()
+            self.fill_pool()
+            need_reset = True
+
+        if len(self.pool) >= count:
+            selected = self.take(count)
+        else:
+            # 池子不够一套：全部取出，再从其余单词中随机补足（每轮最多发生一次）
+            selected = self.take(len(self.pool))
+            chosen = set(selected)
+            others = [i for i in range(len(self.keys)) if i not in chosen and i not in self.removed]
+            selected.extend(self.rng.sample(others, min(count - len(selected), len(others))))
+            self.rng.shuffle(selected)
+
+        self.mark_exported(selected)
+        return selected, need_reset
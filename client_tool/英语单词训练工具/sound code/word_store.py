@@ -0,0 +1,113 @@
+from array import array
+from collections.abc import Mapping, Sequence
+
+
+class WordRecord(Mapping):
+    """单词存储中某一条单词的只读视图，可以像字典一样用word['english']取值"""
+
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store, word_id):
+        self.store = store
+        self.id = word_id
+
+    def __getitem__(self, key):
+        return self.store.get(self.id, key)
+
+    def __iter__(self):
+        return iter(self.store.keys)
+
+    def __len__(self):
+        return len(self.store.keys)
+
+    def __repr__(self):
+        return f"WordRecord({self.id}, {dict(self)!r})"
+
+
+class WordStore(Sequence):
+    """紧凑的单词存储，代替由字典组成的列表
+
+    每个字段单独存为一列，单词用整数ID（即下标）访问；
+    interned中的字段（如词性）取值重复度高，只保存一份字符串，列中存放编号数组
+    """
+
+    def __init__(self, keys, words=(), interned=()):
+        self.keys = tuple(keys)
+        self.columns = {}
+        # 驻留字段：key -> (取值列表, 取值到编号的索引)
+        self.tables = {}
+        for key in self.keys:
+            if key in interned:
+                self.columns[key] = array('I')
+                self.tables[key] = ([], {})
+            else:
+                self.columns[key] = []
+        self.extend(words)
+
+    @classmethod
+    def from_columns(cls, keys, columns, interned=()):
+        """直接由按列排列的数据构造存储，比逐条append快得多"""
+        store = cls(keys, interned=interned)
+        for key, values in zip(store.keys, columns):
+            if key in store.tables:
+                store.columns[key].extend(store.intern(key, value) for value in values)
+            else:
+                store.columns[key] = list(values)
+        return store
+
+    def intern(self, key, value):
+        values, index = self.tables[key]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, word):
+        """添加一条单词（字典或记录），返回它的ID"""
+        for key in self.keys:
+            if key in self.tables:
+                self.columns[key].append(self.intern(key, word[key]))
+            else:
+                self.columns[key].append(word[key])
+        return len(self) - 1
+
+    def extend(self, words):
+        for word in words:
+            self.append(word)
+
+    def get(self, word_id, key):
+        """按ID读取单个字段"""
+        value = self.columns[key][word_id]
+        if key in self.tables:
+            return self.tables[key][0][value]
+        return value
+
+    def column(self, key):
+        """某个字段的所有取值，按ID顺序排列"""
+        if key in self.tables:
+            values = self.tables[key][0]
+            return [values[code] for code in self.columns[key]]
+        return self.columns[key]
+
+    def clear(self):
+        for key in self.keys:
+            del self.columns[key][:]
+            if key in self.tables:
+                self.tables[key] = ([], {})
+
+    def __len__(self):
+        return len(self.columns[self.keys[0]])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [WordRecord(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('word index out of range')
+        return WordRecord(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield WordRecord(self, i)
@@ -0,0 +1,132 @@
+"""词库文件改动的增量计算
+
+保存上次加载时的文件内容，文件改动后与新内容比较，找出首尾相同部分之间的改动区域
+（对齐到整行），只解析区域内的旧行和新行，得到需要删除和新增的单词。
+编辑少量几行时，耗时主要是读取文件和比较字节，与词库大小基本无关。
+"""
+import io
+from collections import Counter
+
+from word_parser import SUITE_LINE_FORMATS
+
+# 比较首尾相同部分时每次比较的字节数
+COMPARE_BLOCK = 64 * 1024
+
+
+def common_prefix(old, new):
+    """old和new开头相同部分的字节数"""
+    limit = min(len(old), len(new))
+    length = 0
+    # 先按块比较，找到第一个不同的块
+    while length < limit:
+        step = min(COMPARE_BLOCK, limit - length)
+        if old[length:length + step] != new[length:length + step]:
+            break
+        length += step
+    else:
+        return limit
+    # 在这个块内二分
+    low, high = 0, step - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[length:length + mid] == new[length:length + mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return length + low
+
+
+def common_suffix(old, new, limit):
+    """old和new结尾相同部分的字节数，不超过limit"""
+    old_size = len(old)
+    new_size = len(new)
+    length = 0
+    while length < limit:
+        step = min(COMPARE_BLOCK, limit - length)
+        if old[old_size - length - step:old_size - length] != new[new_size - length - step:new_size - length]:
+            break
+        length += step
+    else:
+        return limit
+    low, high = 0, step - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[old_size - length - mid:old_size - length] == new[new_size - length - mid:new_size - length]:
+            low = mid
+        else:
+            high = mid - 1
+    return length + low
+
+
+def at_line_start(data, pos):
+    return pos == 0 or data[pos - 1:pos] == b'\n'
+
+
+def changed_region(old, new):
+    """找出改动区域，返回(起始偏移, 旧内容中的结束偏移, 新内容中的结束偏移)，都对齐到整行"""
+    prefix = common_prefix(old, new)
+    # 后缀不能与前缀重叠
+    suffix = common_suffix(old, new, min(len(old), len(new)) - prefix)
+
+    # 起点退回到所在行的开头
+    start = old.rfind(b'\n', 0, prefix) + 1
+    # 终点前进到相同后缀中的下一个行首，新旧内容两边同时前进
+    old_end = len(old) - suffix
+    new_end = len(new) - suffix
+    if not (at_line_start(old, old_end) and at_line_start(new, new_end)):
+        newline = old.find(b'\n', old_end)
+        shift = (newline + 1 if newline >= 0 else len(old)) - old_end
+        old_end += shift
+        new_end += shift
+    return start, old_end, new_end
+
+
+def parse_region(data, parser):
+    """解析一段完整的行，返回(english, chinese)列表"""
+    words = []
+    for line in data.decode('utf-8').split('\n'):
+        parsed = parser(line)
+        if parsed:
+            words.append((parsed['english'], parsed['chinese']))
+    return words
+
+
+def sniff_content(data):
+    """按文件开头的样本行判断学习工具TXT格式，返回逐行解析器"""
+    parser, _ = SUITE_LINE_FORMATS.sniff_stream(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8'))
+    return parser
+
+
+def same_parser(a, b):
+    return a.parse is b.parse and a.fallback is b.fallback
+
+
+class TextBankSnapshot:
+    """一个TXT词库上次加载时的内容和解析器"""
+
+    def __init__(self, content):
+        self.content = content
+        self.parser = sniff_content(content)
+
+    @classmethod
+    def read(cls, file_path):
+        with open(file_path, 'rb') as f:
+            return cls(f.read())
+
+    def diff(self, content):
+        """与新内容比较，返回(删除的单词, 新增的单词)，都是(english, chinese)列表
+
+        文件开头的格式判断发生变化时，逐行解析的结果可能整体改变，返回None表示需要完整重新加载
+        """
+        parser = sniff_content(content)
+        if not same_parser(parser, self.parser):
+            return None
+
+        start, old_end, new_end = changed_region(self.content, content)
+        old_words = Counter(parse_region(self.content[start:old_end], parser))
+        new_words = Counter(parse_region(content[start:new_end], parser))
+        # 区域内只是挪动位置的单词不算改动
+        removed = list((old_words - new_words).elements())
+        added = list((new_words - old_words).elements())
+        self.content = content
+        return removed, added